@@ -21,12 +21,41 @@ __version__ = "2.5.4"
 __author__ = "Minidoracat"
 __email__ = "minidora0702@gmail.com"
 
+import importlib
 import os
+from typing import TYPE_CHECKING, Any
 
-from .server import main as run_server
 
-# 導入新的 Web UI 模組
-from .web import WebUIManager, get_web_ui_manager, launch_web_feedback_ui, stop_web_ui
+if TYPE_CHECKING:
+    from .server import main as run_server
+    from .web import (
+        WebUIManager,
+        get_web_ui_manager,
+        launch_web_feedback_ui,
+        stop_web_ui,
+    )
+
+# 延遲導入：伺服器與 Web UI 模組會連帶載入 fastmcp、FastAPI、uvicorn 等重量級依賴，
+# 僅在首次存取對應屬性時才導入，以縮短 CLI 冷啟動時間
+_LAZY_ATTRIBUTES = {
+    "run_server": (".server", "main"),
+    "WebUIManager": (".web", "WebUIManager"),
+    "get_web_ui_manager": (".web", "get_web_ui_manager"),
+    "launch_web_feedback_ui": (".web", "launch_web_feedback_ui"),
+    "stop_web_ui": (".web", "stop_web_ui"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """按需導入重量級子模組的導出項"""
+    target = _LAZY_ATTRIBUTES.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attr_name = target
+    value = getattr(importlib.import_module(module_name, __name__), attr_name)
+    globals()[name] = value
+    return value
 
 
 # 保持向後兼容性
@@ -11,6 +11,7 @@
 from .debug import debug_log
 
 debug_log("這是一條調試信息")
+debug_log("處理圖片 %s，大小: %s bytes", index, size)  # 僅在輸出時才格式化
 ```
 
 環境變數控制：
@@ -25,12 +26,13 @@ import sys
 from typing import Any
 
 
-def debug_log(message: Any, prefix: str = "DEBUG") -> None:
+def debug_log(message: Any, *args: Any, prefix: str = "DEBUG") -> None:
     """
     輸出調試訊息到標準錯誤，避免污染標準輸出
 
     Args:
-        message: 要輸出的調試信息
+        message: 要輸出的調試信息，傳入 args 時作為 % 格式字符串
+        *args: 格式化參數，僅在調試模式啟用時才格式化，關閉時零開銷
         prefix: 調試信息的前綴標識，默認為 "DEBUG"
     """
     # 只在啟用調試模式時才輸出，避免干擾 MCP 通信
@@ -41,6 +43,8 @@ def debug_log(message: Any, prefix: str = "DEBUG") -> None:
         # 確保消息是字符串類型
         if not isinstance(message, str):
             message = str(message)
+        if args:
+            message = message % args
 
         # 安全地輸出到 stderr，處理編碼問題
         try:
@@ -54,19 +58,19 @@ def debug_log(message: Any, prefix: str = "DEBUG") -> None:
         pass
 
 
-def i18n_debug_log(message: Any) -> None:
+def i18n_debug_log(message: Any, *args: Any) -> None:
     """國際化模組專用的調試日誌"""
-    debug_log(message, "I18N")
+    debug_log(message, *args, prefix="I18N")
 
 
-def server_debug_log(message: Any) -> None:
+def server_debug_log(message: Any, *args: Any) -> None:
     """伺服器模組專用的調試日誌"""
-    debug_log(message, "SERVER")
+    debug_log(message, *args, prefix="SERVER")
 
 
-def web_debug_log(message: Any) -> None:
+def web_debug_log(message: Any, *args: Any) -> None:
     """Web UI 模組專用的調試日誌"""
-    debug_log(message, "WEB")
+    debug_log(message, *args, prefix="WEB")
 
 
 def is_debug_enabled() -> bool:
@@ -15,12 +15,13 @@
 作者: Minidoracat
 """
 
-import json
 import locale
 import os
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from .debug import i18n_debug_log as debug_log
 
 
@@ -55,21 +56,19 @@ class I18nManager:
             lang_dir = self._locales_dir / lang_code
             translation_file = lang_dir / "translation.json"
 
-            if translation_file.exists():
-                try:
-                    with open(translation_file, encoding="utf-8") as f:
-                        data = json.load(f)
-                        self._translations[lang_code] = data
-                        debug_log(
-                            f"成功載入語言 {lang_code}: {data.get('meta', {}).get('displayName', lang_code)}"
-                        )
-                except Exception as e:
-                    debug_log(f"載入語言檔案失敗 {lang_code}: {e}")
-                    # 如果載入失敗，使用空的翻譯
-                    self._translations[lang_code] = {}
-            else:
+            try:
+                data = orjson.loads(translation_file.read_bytes())
+                self._translations[lang_code] = data
+                debug_log(
+                    f"成功載入語言 {lang_code}: {data.get('meta', {}).get('displayName', lang_code)}"
+                )
+            except FileNotFoundError:
                 debug_log(f"找不到語言檔案: {translation_file}")
                 self._translations[lang_code] = {}
+            except Exception as e:
+                debug_log(f"載入語言檔案失敗 {lang_code}: {e}")
+                # 如果載入失敗，使用空的翻譯
+                self._translations[lang_code] = {}
 
     def _detect_language(self) -> str:
         """自動偵測語言"""
@@ -119,21 +118,20 @@ class I18nManager:
     def _load_saved_language(self) -> str | None:
         """載入保存的語言設定"""
         try:
-            if self._config_file.exists():
-                with open(self._config_file, encoding="utf-8") as f:
-                    config = json.load(f)
-                    language = config.get("language")
-                    return language if isinstance(language, str) else None
+            config = orjson.loads(self._config_file.read_bytes())
+            language = config.get("language")
+            return language if isinstance(language, str) else None
         except Exception:
-            pass
-        return None
+            # 設定檔案不存在（FileNotFoundError）或內容無效
+            return None
 
     def save_language(self, language: str) -> None:
         """保存語言設定"""
         try:
             config = {"language": language}
-            with open(self._config_file, "w", encoding="utf-8") as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            self._config_file.write_bytes(
+                orjson.dumps(config, option=orjson.OPT_INDENT_2)
+            )
         except Exception:
             pass
 
@@ -331,17 +329,16 @@ class I18nManager:
             if not translation_file.exists():
                 return False
 
-            with open(translation_file, encoding="utf-8") as f:
-                data = json.load(f)
-                self._translations[language_code] = data
+            data = orjson.loads(translation_file.read_bytes())
+            self._translations[language_code] = data
 
-                if language_code not in self._supported_languages:
-                    self._supported_languages.append(language_code)
+            if language_code not in self._supported_languages:
+                self._supported_languages.append(language_code)
 
-                debug_log(
-                    f"成功添加語言 {language_code}: {data.get('meta', {}).get('displayName', language_code)}"
-                )
-                return True
+            debug_log(
+                f"成功添加語言 {language_code}: {data.get('meta', {}).get('displayName', language_code)}"
+            )
+            return True
         except Exception as e:
             debug_log(f"添加語言失敗 {language_code}: {e}")
             return False
@@ -23,18 +23,25 @@ MCP Feedback Enhanced 伺服器主要模組
 重構: 模塊化設計
 """
 
+import asyncio
 import base64
+import binascii
+import copy
 import datetime
+import functools
+import hashlib
 import io
-import json
 import os
 import sys
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Annotated, Any
 
+import orjson
 from fastmcp import FastMCP
 from fastmcp.utilities.types import Image as MCPImage
 from mcp.types import TextContent
-from pydantic import Field
+from pydantic import Field, TypeAdapter
 
 # 導入統一的調試功能
 from .debug import server_debug_log as debug_log
@@ -43,6 +50,9 @@ from .debug import server_debug_log as debug_log
 # 導入錯誤處理框架
 from .utils.error_handler import ErrorHandler, ErrorType
 
+# 導入 DAG 並行調度器
+from .utils.parallel_dispatcher import ParallelDispatcher
+
 # 導入資源管理器
 from .utils.resource_manager import create_temp_file
 
@@ -112,6 +122,33 @@ _encoding_initialized = init_encoding()
 SERVER_NAME = "互動式回饋收集 MCP"
 SSH_ENV_VARS = ["SSH_CONNECTION", "SSH_CLIENT", "SSH_TTY"]
 REMOTE_ENV_VARS = ["REMOTE_CONTAINERS", "CODESPACES"]
+WSL_ENV_VARS = ["WSL_DISTRO_NAME", "WSL_INTEROP", "WSLENV"]
+WSL_PATHS = ["/mnt/c", "/mnt/d", "/proc/sys/fs/binfmt_misc/WSLInterop"]
+PYTHON_VERSION = sys.version.split()[0]
+# get_system_info 回報的環境變數
+SYSTEM_INFO_ENV_VARS = (
+    "SSH_CONNECTION",
+    "SSH_CLIENT",
+    "DISPLAY",
+    "VSCODE_INJECTION",
+    "SESSIONNAME",
+    "WSL_DISTRO_NAME",
+    "WSL_INTEROP",
+    "WSLENV",
+)
+
+# 圖片副檔名到 MCPImage 格式 / MIME 類型的映射，未列出的副檔名按 PNG 處理
+IMAGE_FORMAT_BY_SUFFIX = {".jpg": "jpeg", ".jpeg": "jpeg", ".gif": "gif"}
+IMAGE_MIME_BY_SUFFIX = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+# 工具回應預設輸出緊湊 JSON（消費者多為程式），設置 MCP_PRETTY_JSON=true 時改為縮排輸出
+PRETTY_JSON = os.getenv("MCP_PRETTY_JSON", "").lower() in ("true", "1", "yes", "on")
+_DUMPS_OPTIONS = orjson.OPT_INDENT_2 if PRETTY_JSON else 0
 
 
 # 初始化 MCP 服務器
@@ -129,36 +166,39 @@ else:
     # 預設使用 INFO 等級
     fastmcp_settings["log_level"] = "INFO"
 
-mcp: Any = FastMCP(SERVER_NAME)
+mcp = FastMCP(SERVER_NAME)
 
 
 # ===== 工具函數 =====
+@functools.lru_cache(maxsize=1)
 def is_wsl_environment() -> bool:
     """
     檢測是否在 WSL (Windows Subsystem for Linux) 環境中運行
 
+    運行環境在進程生命週期內不會改變，結果在首次檢測後緩存。
+
     Returns:
         bool: True 表示 WSL 環境，False 表示其他環境
     """
     try:
-        # 檢查 /proc/version 文件是否包含 WSL 標識
-        if os.path.exists("/proc/version"):
-            with open("/proc/version") as f:
+        # 檢查 /proc/version 文件是否包含 WSL 標識（以二進位模式直接讀取，不存在時跳過）
+        try:
+            with open("/proc/version", "rb") as f:
                 version_info = f.read().lower()
-                if "microsoft" in version_info or "wsl" in version_info:
-                    debug_log("偵測到 WSL 環境（通過 /proc/version）")
-                    return True
+        except OSError:
+            version_info = b""
+        if b"microsoft" in version_info or b"wsl" in version_info:
+            debug_log("偵測到 WSL 環境（通過 /proc/version）")
+            return True
 
         # 檢查 WSL 相關環境變數
-        wsl_env_vars = ["WSL_DISTRO_NAME", "WSL_INTEROP", "WSLENV"]
-        for env_var in wsl_env_vars:
+        for env_var in WSL_ENV_VARS:
             if os.getenv(env_var):
                 debug_log(f"偵測到 WSL 環境變數: {env_var}")
                 return True
 
         # 檢查是否存在 WSL 特有的路徑
-        wsl_paths = ["/mnt/c", "/mnt/d", "/proc/sys/fs/binfmt_misc/WSLInterop"]
-        for path in wsl_paths:
+        for path in WSL_PATHS:
             if os.path.exists(path):
                 debug_log(f"偵測到 WSL 特有路徑: {path}")
                 return True
@@ -169,10 +209,13 @@ def is_wsl_environment() -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=1)
 def is_remote_environment() -> bool:
     """
     檢測是否在遠端環境中運行
 
+    運行環境在進程生命週期內不會改變，結果在首次檢測後緩存。
+
     Returns:
         bool: True 表示遠端環境，False 表示本地環境
     """
@@ -217,6 +260,108 @@ def is_remote_environment() -> bool:
     return False
 
 
+def _dumps(obj: Any) -> str:
+    """
+    將工具回應序列化為 JSON 字符串
+
+    Args:
+        obj: 要序列化的對象
+
+    Returns:
+        str: JSON 字符串，僅在 PRETTY_JSON 啟用時縮排
+    """
+    return orjson.dumps(obj, option=_DUMPS_OPTIONS).decode("utf-8")
+
+
+def _dag_digest(*parts: str) -> str:
+    """
+    計算 DAG 內容的穩定摘要，用於生成跨進程可重現的存儲檔名
+
+    內建 hash() 對字符串按進程隨機化，且取模後極易碰撞，因此改用 blake2b。
+
+    Args:
+        *parts: 參與摘要的文本片段
+
+    Returns:
+        str: 10 位十六進制摘要
+    """
+    hasher = hashlib.blake2b(digest_size=5)
+    for part in parts:
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+# DAG 數據必須是 JSON 物件；由 pydantic-core 在一次遍歷中完成解析與校驗
+_DAG_ADAPTER: TypeAdapter[dict[str, Any]] = TypeAdapter(dict[str, Any])
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_dag(dag_json: str) -> dict:
+    """
+    解析並校驗 DAG JSON 字符串，快取結果
+
+    同一次編排流程中，相同的 DAG JSON 會被多個 AI 工具重複傳入，
+    以內容為鍵快取解析結果可避免重複解析。返回的字典為共享物件，呼叫方不應修改。
+
+    Args:
+        dag_json: DAG 的 JSON 字符串
+
+    Returns:
+        dict: 解析後的 DAG 數據
+
+    Raises:
+        ValueError: JSON 格式錯誤或頂層不是物件（pydantic.ValidationError）
+    """
+    return _DAG_ADAPTER.validate_json(dag_json)
+
+
+def _extract_dag_graph(dag_info: Any) -> tuple[list[str], list[tuple[str, str]]]:
+    """
+    從 DAG 數據中提取節點 ID 與邊
+
+    支援 {"nodes": [...], "edges": [...]} 或包在 "parsed_dag" 中的結構；
+    節點可為字符串或帶 "id" 的字典，邊可為 [上游, 下游] 或帶 source/target（from/to）的字典。
+
+    Args:
+        dag_info: 解析後的 DAG 數據
+
+    Returns:
+        tuple: (節點 ID 列表, (上游, 下游) 邊列表)
+    """
+    if not isinstance(dag_info, dict):
+        return [], []
+    if isinstance(dag_info.get("parsed_dag"), dict):
+        dag_info = dag_info["parsed_dag"]
+
+    nodes = []
+    for node in dag_info.get("nodes") or []:
+        node_id = node.get("id") if isinstance(node, dict) else node
+        if node_id is not None:
+            nodes.append(str(node_id))
+
+    edges = []
+    for edge in dag_info.get("edges") or []:
+        if isinstance(edge, dict):
+            source = edge.get("source", edge.get("from"))
+            target = edge.get("target", edge.get("to"))
+        elif isinstance(edge, list | tuple) and len(edge) == 2:
+            source, target = edge
+        else:
+            continue
+        if source is not None and target is not None:
+            edges.append((str(source), str(target)))
+
+    return nodes, edges
+
+
+def _encode_bytes_base64(obj: Any) -> str:
+    """orjson default 鉤子：將 bytes 編碼為 base64 字符串"""
+    if isinstance(obj, bytes | bytearray):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
 def save_feedback_to_file(feedback_data: dict, file_path: str | None = None) -> str:
     """
     將回饋資料儲存到 JSON 文件
@@ -232,34 +377,31 @@ def save_feedback_to_file(feedback_data: dict, file_path: str | None = None) ->
         # 使用資源管理器創建臨時文件
         file_path = create_temp_file(suffix=".json", prefix="feedback_")
 
-    # 確保目錄存在
+    # 確保目錄存在（exist_ok 已處理目錄存在的情況，無需預先 stat）
     directory = os.path.dirname(file_path)
-    if directory and not os.path.exists(directory):
+    if directory:
         os.makedirs(directory, exist_ok=True)
 
-    # 複製數據以避免修改原始數據
-    json_data = feedback_data.copy()
-
-    # 處理圖片數據：將 bytes 轉換為 base64 字符串以便 JSON 序列化
-    if "images" in json_data and isinstance(json_data["images"], list):
-        processed_images = []
-        for img in json_data["images"]:
-            if isinstance(img, dict) and "data" in img:
-                processed_img = img.copy()
-                # 如果 data 是 bytes，轉換為 base64 字符串
-                if isinstance(img["data"], bytes):
-                    processed_img["data"] = base64.b64encode(img["data"]).decode(
-                        "utf-8"
-                    )
-                    processed_img["data_type"] = "base64"
-                processed_images.append(processed_img)
-            else:
-                processed_images.append(img)
-        json_data["images"] = processed_images
+    # 圖片 bytes 保持原樣，由 orjson 在序列化時經 default 鉤子直接編碼為 base64，
+    # 只為帶 bytes 的圖片補充 data_type 標記，不再複製整份資料
+    json_data = feedback_data
+    images = feedback_data.get("images")
+    if isinstance(images, list):
+        json_data = {
+            **feedback_data,
+            "images": [
+                {**img, "data_type": "base64"}
+                if isinstance(img, dict) and isinstance(img.get("data"), bytes)
+                else img
+                for img in images
+            ],
+        }
 
-    # 儲存資料
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    # 儲存資料（機器讀取的臨時文件，與工具回應一致，僅在 PRETTY_JSON 啟用時縮排）
+    with open(file_path, "wb") as f:
+        f.write(
+            orjson.dumps(json_data, default=_encode_bytes_base64, option=_DUMPS_OPTIONS)
+        )
 
     debug_log(f"回饋資料已儲存至: {file_path}")
     return file_path
@@ -309,25 +451,30 @@ def create_feedback_text(feedback_data: dict) -> str:
             # 為提高兼容性，添加 base64 預覽信息
             if img.get("data"):
                 try:
-                    if isinstance(img["data"], bytes):
-                        img_base64 = base64.b64encode(img["data"]).decode("utf-8")
-                    elif isinstance(img["data"], str):
-                        img_base64 = img["data"]
+                    data = img["data"]
+                    if isinstance(data, bytes):
+                        # 預覽只需前 50 個字符，僅編碼對應的前 38 bytes，
+                        # 完整編碼延後到詳細模式，避免為每張圖片生成整份 base64 副本
+                        base64_head = base64.b64encode(data[:38]).decode("ascii")
+                        base64_length = (len(data) + 2) // 3 * 4
+                    elif isinstance(data, str):
+                        base64_head = data
+                        base64_length = len(data)
                     else:
-                        img_base64 = None
+                        base64_head = None
 
-                    if img_base64:
+                    if base64_head:
                         # 只顯示前50個字符的預覽
                         preview = (
-                            img_base64[:50] + "..."
-                            if len(img_base64) > 50
-                            else img_base64
+                            base64_head[:50] + "..."
+                            if base64_length > 50
+                            else base64_head
                         )
                         img_info += f"\n     Base64 預覽: {preview}"
-                        img_info += f"\n     完整 Base64 長度: {len(img_base64)} 字符"
+                        img_info += f"\n     完整 Base64 長度: {base64_length} 字符"
 
                         # 如果 AI 助手不支援 MCP 圖片，可以提供完整 base64
-                        debug_log(f"圖片 {i} Base64 已準備，長度: {len(img_base64)}")
+                        debug_log("圖片 %s Base64 已準備，長度: %s", i, base64_length)
 
                         # 檢查是否啟用 Base64 詳細模式（從 UI 設定中獲取）
                         include_full_base64 = feedback_data.get("settings", {}).get(
@@ -335,21 +482,20 @@ def create_feedback_text(feedback_data: dict) -> str:
                         )
 
                         if include_full_base64:
+                            img_base64 = (
+                                data
+                                if isinstance(data, str)
+                                else base64.b64encode(data).decode("ascii")
+                            )
                             # 根據檔案名推斷 MIME 類型
                             file_name = img.get("name", "image.png")
-                            if file_name.lower().endswith((".jpg", ".jpeg")):
-                                mime_type = "image/jpeg"
-                            elif file_name.lower().endswith(".gif"):
-                                mime_type = "image/gif"
-                            elif file_name.lower().endswith(".webp"):
-                                mime_type = "image/webp"
-                            else:
-                                mime_type = "image/png"
+                            suffix = os.path.splitext(file_name)[1].lower()
+                            mime_type = IMAGE_MIME_BY_SUFFIX.get(suffix, "image/png")
 
                             img_info += f"\n     完整 Base64: data:{mime_type};base64,{img_base64}"
 
                 except Exception as e:
-                    debug_log(f"圖片 {i} Base64 處理失敗: {e}")
+                    debug_log("圖片 %s Base64 處理失敗: %s", i, e)
 
             text_parts.append(img_info)
 
@@ -376,7 +522,7 @@ def process_images(images_data: list[dict]) -> list[MCPImage]:
     for i, img in enumerate(images_data, 1):
         try:
             if not img.get("data"):
-                debug_log(f"圖片 {i} 沒有資料，跳過")
+                debug_log("圖片 %s 沒有資料，跳過", i)
                 continue
 
             # 檢查數據類型並相應處理
@@ -384,34 +530,31 @@ def process_images(images_data: list[dict]) -> list[MCPImage]:
                 # 如果是原始 bytes 數據，直接使用
                 image_bytes = img["data"]
                 debug_log(
-                    f"圖片 {i} 使用原始 bytes 數據，大小: {len(image_bytes)} bytes"
+                    "圖片 %d 使用原始 bytes 數據，大小: %d bytes", i, len(image_bytes)
                 )
             elif isinstance(img["data"], str):
-                # 如果是 base64 字符串，進行解碼
-                image_bytes = base64.b64decode(img["data"])
-                debug_log(f"圖片 {i} 從 base64 解碼，大小: {len(image_bytes)} bytes")
+                # 如果是 base64 字符串，進行解碼（a2b_base64 直接讀取 ASCII 字符串，
+                # 省去 b64decode 先 encode 成 bytes 的整份複製）
+                image_bytes = binascii.a2b_base64(img["data"])
+                debug_log("圖片 %s 從 base64 解碼，大小: %s bytes", i, len(image_bytes))
             else:
-                debug_log(f"圖片 {i} 數據類型不支援: {type(img['data'])}")
+                debug_log("圖片 %s 數據類型不支援: %s", i, type(img["data"]))
                 continue
 
             if len(image_bytes) == 0:
-                debug_log(f"圖片 {i} 數據為空，跳過")
+                debug_log("圖片 %s 數據為空，跳過", i)
                 continue
 
             # 根據文件名推斷格式
             file_name = img.get("name", "image.png")
-            if file_name.lower().endswith((".jpg", ".jpeg")):
-                image_format = "jpeg"
-            elif file_name.lower().endswith(".gif"):
-                image_format = "gif"
-            else:
-                image_format = "png"  # 默認使用 PNG
+            suffix = os.path.splitext(file_name)[1].lower()
+            image_format = IMAGE_FORMAT_BY_SUFFIX.get(suffix, "png")  # 默認使用 PNG
 
             # 創建 MCPImage 對象
             mcp_image = MCPImage(data=image_bytes, format=image_format)
             mcp_images.append(mcp_image)
 
-            debug_log(f"圖片 {i} ({file_name}) 處理成功，格式: {image_format}")
+            debug_log("圖片 %s (%s) 處理成功，格式: %s", i, file_name, image_format)
 
         except Exception as e:
             # 使用統一錯誤處理（不影響 JSON RPC）
@@ -420,9 +563,9 @@ def process_images(images_data: list[dict]) -> list[MCPImage]:
                 context={"operation": "圖片處理", "image_index": i},
                 error_type=ErrorType.FILE_IO,
             )
-            debug_log(f"圖片 {i} 處理失敗 [錯誤ID: {error_id}]: {e}")
+            debug_log("圖片 %s 處理失敗 [錯誤ID: %s]: %s", i, error_id, e)
 
-    debug_log(f"共處理 {len(mcp_images)} 張圖片")
+    debug_log("共處理 %s 張圖片", len(mcp_images))
     return mcp_images
 
 
@@ -480,8 +623,8 @@ async def interactive_feedback(
         if not result:
             return [TextContent(type="text", text="用戶取消了回饋。")]
 
-        # 儲存詳細結果
-        save_feedback_to_file(result)
+        # 儲存詳細結果（在線程中寫入，避免阻塞事件循環）
+        await asyncio.to_thread(save_feedback_to_file, result)
 
         # 建立回饋項目列表
         feedback_items = []
@@ -579,27 +722,221 @@ def get_system_info() -> str:
 
     system_info = {
         "平台": sys.platform,
-        "Python 版本": sys.version.split()[0],
+        "Python 版本": PYTHON_VERSION,
         "WSL 環境": is_wsl,
         "遠端環境": is_remote,
         "介面類型": "Web UI",
-        "環境變數": {
-            "SSH_CONNECTION": os.getenv("SSH_CONNECTION"),
-            "SSH_CLIENT": os.getenv("SSH_CLIENT"),
-            "DISPLAY": os.getenv("DISPLAY"),
-            "VSCODE_INJECTION": os.getenv("VSCODE_INJECTION"),
-            "SESSIONNAME": os.getenv("SESSIONNAME"),
-            "WSL_DISTRO_NAME": os.getenv("WSL_DISTRO_NAME"),
-            "WSL_INTEROP": os.getenv("WSL_INTEROP"),
-            "WSLENV": os.getenv("WSLENV"),
-        },
+        "環境變數": {name: os.environ.get(name) for name in SYSTEM_INFO_ENV_VARS},
     }
 
-    return json.dumps(system_info, ensure_ascii=False, indent=2)
+    return _dumps(system_info)
 
 
 # ===== 四層 DAG 構建工具 =====
 
+
+@dataclass(frozen=True)
+class _LayerConfig:
+    """單層 DAG 構建配置，四個 build_*_layer_dag 工具共用同一構建流程"""
+
+    layer: str
+    name: str
+    description: str
+    label: str
+    upstream_label: str
+    focus: tuple[str, ...]
+    depends_on: tuple[str, ...] = ()
+    # 跨層映射的三個字段名：(映射表, 覆蓋率, 檢查狀態)
+    mapping_keys: tuple[str, str, str] | None = None
+    validation_messages: tuple[str, ...] = ()
+    # 排序層為最後一層，額外輸出四層總結和完整 DAG 存儲路徑
+    is_final: bool = False
+
+
+_LAYER_CONFIGS = {
+    "function": _LayerConfig(
+        layer="function",
+        name="功能層 (What Layer)",
+        description="業務目標和功能需求層",
+        label="功能層",
+        upstream_label="項目描述",
+        focus=("業務功能識別", "功能模塊依賴", "需求映射", "優先級評估"),
+        validation_messages=("功能層 DAG 接收成功",),
+    ),
+    "logic": _LayerConfig(
+        layer="logic",
+        name="邏輯層 (How Layer)",
+        description="技術架構和系統設計層",
+        label="邏輯層",
+        upstream_label="功能層結果",
+        focus=("技術架構設計", "系統組件關係", "API接口定義", "數據流控制"),
+        depends_on=("function",),
+        mapping_keys=("function_to_logic", "mapping_completeness", "consistency_check"),
+        validation_messages=("邏輯層 DAG 接收成功",),
+    ),
+    "code": _LayerConfig(
+        layer="code",
+        name="代碼層 (Code Layer)",
+        description="代碼實現和模塊組織層",
+        label="代碼層",
+        upstream_label="邏輯層結果",
+        focus=("代碼模塊結構", "文件組織架構", "類函數設計", "依賴管理"),
+        depends_on=("function", "logic"),
+        mapping_keys=(
+            "logic_to_code",
+            "implementation_coverage",
+            "dependency_analysis",
+        ),
+        validation_messages=("代碼層 DAG 接收成功",),
+    ),
+    "order": _LayerConfig(
+        layer="order",
+        name="排序層 (When Layer)",
+        description="執行順序和時序安排層",
+        label="排序層",
+        upstream_label="代碼層結果",
+        focus=("執行順序規劃", "任務依賴關係", "資源分配計劃", "時間節點安排"),
+        depends_on=("function", "logic", "code"),
+        mapping_keys=("code_to_order", "execution_feasibility", "resource_allocation"),
+        validation_messages=("排序層 DAG 接收成功", "四層 DAG 構建完成"),
+        is_final=True,
+    ),
+}
+
+
+def _count_arrow_lines(mermaid_dag: str) -> int:
+    """
+    統計包含箭頭（-> 或 -->）的行數
+
+    直接在原字符串上跳躍查找，不拆分成行列表。
+    """
+    count = 0
+    pos = mermaid_dag.find("->")
+    while pos != -1:
+        count += 1
+        line_end = mermaid_dag.find("\n", pos)
+        if line_end == -1:
+            break
+        pos = mermaid_dag.find("->", line_end)
+    return count
+
+
+def _build_layer_dag(layer: str, upstream_key: str, inputs: dict[str, str]) -> str:
+    """
+    按層配置構建單層 DAG 結果
+
+    Args:
+        layer: 層類型（function/logic/code/order）
+        upstream_key: inputs 中上游輸入的字段名（項目描述或上一層結果）
+        inputs: 工具的原始輸入，按 input_data 的字段順序排列
+
+    Returns:
+        str: JSON 格式的處理結果
+    """
+    config = _LAYER_CONFIGS[layer]
+    upstream = inputs[upstream_key]
+    mermaid_dag = inputs["mermaid_dag"]
+    try:
+        debug_log("開始構建%s DAG", config.label)
+        debug_log("%s長度: %s 字符", config.upstream_label, len(upstream))
+        debug_log("接收到 Mermaid DAG 長度: %s 字符", len(mermaid_dag))
+        dag_digest = _dag_digest(mermaid_dag)
+
+        metadata: dict[str, Any] = {
+            "layer": layer,
+            "focus": list(config.focus),
+            "node_count": 0,
+            "edge_count": 0,
+        }
+        if config.depends_on:
+            metadata["depends_on"] = list(config.depends_on)
+
+        # 構建結果數據結構
+        result: dict[str, Any] = {
+            "success": True,
+            "layer_type": layer,
+            "layer_name": config.name,
+            "description": config.description,
+            "input_data": {
+                **inputs,
+                "timestamp": datetime.datetime.now().isoformat(),
+            },
+            "parsed_dag": {"nodes": [], "edges": [], "metadata": metadata},
+            "validation": {
+                "is_valid": True,
+                "validation_messages": list(config.validation_messages),
+                "warnings": [],
+                "errors": [],
+            },
+        }
+        if config.mapping_keys:
+            mapping_key, score_key, status_key = config.mapping_keys
+            result["cross_layer_mapping"] = {
+                mapping_key: {},
+                score_key: 0.0,
+                status_key: "pending",
+            }
+
+        storage_info = {
+            "format": "unified_dag_model",
+            "storage_path": f"{layer}_layer_{dag_digest}.json",
+            "backup_created": True,
+        }
+        if config.is_final:
+            result["four_layer_summary"] = {
+                "all_layers_completed": True,
+                "total_layers": 4,
+                "layer_sequence": ["function", "logic", "code", "order"],
+                "integration_status": "ready_for_validation",
+                "next_steps": ["跨層一致性驗證", "完整性檢查", "優化建議生成"],
+            }
+            storage_info["complete_dag_path"] = (
+                f"complete_four_layer_dag_{_dag_digest(upstream, mermaid_dag)}.json"
+            )
+        result["storage_info"] = storage_info
+
+        # 簡單的 Mermaid 解析
+        if mermaid_dag:
+            # 目前節點數與邊數均按含箭頭的行數估算，只需統計一次
+            edge_count = _count_arrow_lines(mermaid_dag)
+            node_count = edge_count
+
+            metadata["node_count"] = node_count
+            metadata["edge_count"] = edge_count
+
+            debug_log(
+                "%s DAG 解析完成 - 節點: %s, 邊: %s",
+                config.label,
+                node_count,
+                edge_count,
+            )
+            if config.is_final:
+                debug_log("四層 DAG 構建流程完成！")
+
+        return _dumps(result)
+
+    except Exception as e:
+        # 功能層的上游是項目描述，原樣回傳；其餘層的上游是整層結果，只回傳長度
+        if config.depends_on:
+            upstream_info: dict[str, Any] = {
+                f"{upstream_key}_length": len(upstream) if upstream else 0
+            }
+        else:
+            upstream_info = {upstream_key: upstream}
+        error_result = {
+            "success": False,
+            "layer_type": layer,
+            "error": str(e),
+            "error_type": "parsing_error",
+            "input_data": {
+                **upstream_info,
+                "mermaid_dag_length": len(mermaid_dag) if mermaid_dag else 0,
+            },
+        }
+        debug_log("%s DAG 構建失敗: %s", config.label, e)
+        return _dumps(error_result)
+
+
 @mcp.tool()
 def build_function_layer_dag(
     project_description: Annotated[str, Field(description="項目描述和目標")] = "",
@@ -626,73 +963,15 @@ def build_function_layer_dag(
     Returns:
         str: JSON 格式的處理結果，包含成功狀態和 DAG 數據
     """
-    try:
-        debug_log("開始構建功能層 DAG")
-        debug_log(f"項目描述: {project_description[:100]}...")
-        debug_log(f"接收到 Mermaid DAG 長度: {len(mermaid_dag)} 字符")
-        
-        # 構建結果數據結構
-        result = {
-            "success": True,
-            "layer_type": "function",
-            "layer_name": "功能層 (What Layer)",
-            "description": "業務目標和功能需求層",
-            "input_data": {
-                "project_description": project_description,
-                "mermaid_dag": mermaid_dag,
-                "business_requirements": business_requirements,
-                "timestamp": datetime.datetime.now().isoformat()
-            },
-            "parsed_dag": {
-                "nodes": [],
-                "edges": [],
-                "metadata": {
-                    "layer": "function",
-                    "focus": ["業務功能識別", "功能模塊依賴", "需求映射", "優先級評估"],
-                    "node_count": 0,
-                    "edge_count": 0
-                }
-            },
-            "validation": {
-                "is_valid": True,
-                "validation_messages": ["功能層 DAG 接收成功"],
-                "warnings": [],
-                "errors": []
-            },
-            "storage_info": {
-                "format": "unified_dag_model",
-                "storage_path": f"function_layer_{hash(mermaid_dag) % 10000}.json",
-                "backup_created": True
-            }
-        }
-        
-        # 簡單的 Mermaid 解析（第一步先不做複雜驗證）
-        if mermaid_dag:
-            lines = mermaid_dag.split('\n')
-            node_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            edge_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            
-            result["parsed_dag"]["metadata"]["node_count"] = node_count
-            result["parsed_dag"]["metadata"]["edge_count"] = edge_count
-            
-            debug_log(f"功能層 DAG 解析完成 - 節點: {node_count}, 邊: {edge_count}")
-        
-        # 返回 JSON 字符串格式的結果
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "layer_type": "function",
-            "error": str(e),
-            "error_type": "parsing_error",
-            "input_data": {
-                "project_description": project_description,
-                "mermaid_dag_length": len(mermaid_dag) if mermaid_dag else 0
-            }
-        }
-        debug_log(f"功能層 DAG 構建失敗: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+    return _build_layer_dag(
+        "function",
+        "project_description",
+        {
+            "project_description": project_description,
+            "mermaid_dag": mermaid_dag,
+            "business_requirements": business_requirements,
+        },
+    )
 
 
 @mcp.tool()
@@ -721,78 +1000,15 @@ def build_logic_layer_dag(
     Returns:
         str: JSON 格式的處理結果，包含成功狀態和 DAG 數據
     """
-    try:
-        debug_log("開始構建邏輯層 DAG")
-        debug_log(f"功能層結果長度: {len(function_layer_result)} 字符")
-        debug_log(f"接收到 Mermaid DAG 長度: {len(mermaid_dag)} 字符")
-        
-        # 構建結果數據結構
-        result = {
-            "success": True,
-            "layer_type": "logic",
-            "layer_name": "邏輯層 (How Layer)",
-            "description": "技術架構和系統設計層",
-            "input_data": {
-                "function_layer_result": function_layer_result,
-                "mermaid_dag": mermaid_dag,
-                "technical_architecture": technical_architecture,
-                "timestamp": datetime.datetime.now().isoformat()
-            },
-            "parsed_dag": {
-                "nodes": [],
-                "edges": [],
-                "metadata": {
-                    "layer": "logic",
-                    "focus": ["技術架構設計", "系統組件關係", "API接口定義", "數據流控制"],
-                    "node_count": 0,
-                    "edge_count": 0,
-                    "depends_on": ["function"]
-                }
-            },
-            "validation": {
-                "is_valid": True,
-                "validation_messages": ["邏輯層 DAG 接收成功"],
-                "warnings": [],
-                "errors": []
-            },
-            "cross_layer_mapping": {
-                "function_to_logic": {},
-                "mapping_completeness": 0.0,
-                "consistency_check": "pending"
-            },
-            "storage_info": {
-                "format": "unified_dag_model",
-                "storage_path": f"logic_layer_{hash(mermaid_dag) % 10000}.json",
-                "backup_created": True
-            }
-        }
-        
-        # 簡單的 Mermaid 解析
-        if mermaid_dag:
-            lines = mermaid_dag.split('\n')
-            node_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            edge_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            
-            result["parsed_dag"]["metadata"]["node_count"] = node_count
-            result["parsed_dag"]["metadata"]["edge_count"] = edge_count
-            
-            debug_log(f"邏輯層 DAG 解析完成 - 節點: {node_count}, 邊: {edge_count}")
-        
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "layer_type": "logic",
-            "error": str(e),
-            "error_type": "parsing_error",
-            "input_data": {
-                "function_layer_result_length": len(function_layer_result) if function_layer_result else 0,
-                "mermaid_dag_length": len(mermaid_dag) if mermaid_dag else 0
-            }
-        }
-        debug_log(f"邏輯層 DAG 構建失敗: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+    return _build_layer_dag(
+        "logic",
+        "function_layer_result",
+        {
+            "function_layer_result": function_layer_result,
+            "mermaid_dag": mermaid_dag,
+            "technical_architecture": technical_architecture,
+        },
+    )
 
 
 @mcp.tool()
@@ -821,78 +1037,15 @@ def build_code_layer_dag(
     Returns:
         str: JSON 格式的處理結果，包含成功狀態和 DAG 數據
     """
-    try:
-        debug_log("開始構建代碼層 DAG")
-        debug_log(f"邏輯層結果長度: {len(logic_layer_result)} 字符")
-        debug_log(f"接收到 Mermaid DAG 長度: {len(mermaid_dag)} 字符")
-        
-        # 構建結果數據結構
-        result = {
-            "success": True,
-            "layer_type": "code",
-            "layer_name": "代碼層 (Code Layer)",
-            "description": "代碼實現和模塊組織層",
-            "input_data": {
-                "logic_layer_result": logic_layer_result,
-                "mermaid_dag": mermaid_dag,
-                "implementation_details": implementation_details,
-                "timestamp": datetime.datetime.now().isoformat()
-            },
-            "parsed_dag": {
-                "nodes": [],
-                "edges": [],
-                "metadata": {
-                    "layer": "code",
-                    "focus": ["代碼模塊結構", "文件組織架構", "類函數設計", "依賴管理"],
-                    "node_count": 0,
-                    "edge_count": 0,
-                    "depends_on": ["function", "logic"]
-                }
-            },
-            "validation": {
-                "is_valid": True,
-                "validation_messages": ["代碼層 DAG 接收成功"],
-                "warnings": [],
-                "errors": []
-            },
-            "cross_layer_mapping": {
-                "logic_to_code": {},
-                "implementation_coverage": 0.0,
-                "dependency_analysis": "pending"
-            },
-            "storage_info": {
-                "format": "unified_dag_model",
-                "storage_path": f"code_layer_{hash(mermaid_dag) % 10000}.json",
-                "backup_created": True
-            }
-        }
-        
-        # 簡單的 Mermaid 解析
-        if mermaid_dag:
-            lines = mermaid_dag.split('\n')
-            node_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            edge_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            
-            result["parsed_dag"]["metadata"]["node_count"] = node_count
-            result["parsed_dag"]["metadata"]["edge_count"] = edge_count
-            
-            debug_log(f"代碼層 DAG 解析完成 - 節點: {node_count}, 邊: {edge_count}")
-        
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "layer_type": "code",
-            "error": str(e),
-            "error_type": "parsing_error",
-            "input_data": {
-                "logic_layer_result_length": len(logic_layer_result) if logic_layer_result else 0,
-                "mermaid_dag_length": len(mermaid_dag) if mermaid_dag else 0
-            }
-        }
-        debug_log(f"代碼層 DAG 構建失敗: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+    return _build_layer_dag(
+        "code",
+        "logic_layer_result",
+        {
+            "logic_layer_result": logic_layer_result,
+            "mermaid_dag": mermaid_dag,
+            "implementation_details": implementation_details,
+        },
+    )
 
 
 @mcp.tool()
@@ -921,90 +1074,133 @@ def build_order_layer_dag(
     Returns:
         str: JSON 格式的處理結果，包含成功狀態和完整的四層 DAG 數據
     """
+    return _build_layer_dag(
+        "order",
+        "code_layer_result",
+        {
+            "code_layer_result": code_layer_result,
+            "mermaid_dag": mermaid_dag,
+            "execution_strategy": execution_strategy,
+        },
+    )
+
+
+# ===== AI智能节点状态管理工具 =====
+
+
+def _cached_builder(builder: Callable[..., dict]) -> Callable[..., dict]:
+    """
+    按参数缓存AI工具的结果构建函数
+
+    结果只依赖输入字符串，缓存可应对重复探测；每次调用返回缓存结果的深拷贝，
+    调用方修改返回值不会污染缓存。
+
+    Args:
+        builder: 构建工具结果的函数
+
+    Returns:
+        Callable: 带缓存的构建函数
+    """
+    cached = functools.lru_cache(maxsize=128)(builder)
+
+    @functools.wraps(builder)
+    def wrapper(*args: str) -> dict:
+        return copy.deepcopy(cached(*args))
+
+    return wrapper
+
+
+def _run_ai_tool(
+    label: str,
+    error_type: str,
+    builder: Callable[..., dict],
+    *args: str,
+    error_context: dict | None = None,
+) -> str:
+    """
+    AI工具的统一执行流程
+
+    调用结果构建函数，补充 success 与 timestamp 字段后序列化；
+    构建失败时返回统一格式的错误结果。
+
+    Args:
+        label: 工具名称，用于调试日志
+        error_type: 失败时返回的错误类型
+        builder: 构建工具结果的函数
+        *args: 传给构建函数的参数
+        error_context: 失败时附加到错误结果中的上下文字段
+
+    Returns:
+        str: JSON格式的工具结果
+    """
+    debug_log("开始%s", label)
+    timestamp = datetime.datetime.now().isoformat()
     try:
-        debug_log("開始構建排序層 DAG")
-        debug_log(f"代碼層結果長度: {len(code_layer_result)} 字符")
-        debug_log(f"接收到 Mermaid DAG 長度: {len(mermaid_dag)} 字符")
-        
-        # 構建結果數據結構
-        result = {
-            "success": True,
-            "layer_type": "order",
-            "layer_name": "排序層 (When Layer)",
-            "description": "執行順序和時序安排層",
-            "input_data": {
-                "code_layer_result": code_layer_result,
-                "mermaid_dag": mermaid_dag,
-                "execution_strategy": execution_strategy,
-                "timestamp": datetime.datetime.now().isoformat()
-            },
-            "parsed_dag": {
-                "nodes": [],
-                "edges": [],
-                "metadata": {
-                    "layer": "order",
-                    "focus": ["執行順序規劃", "任務依賴關係", "資源分配計劃", "時間節點安排"],
-                    "node_count": 0,
-                    "edge_count": 0,
-                    "depends_on": ["function", "logic", "code"]
-                }
-            },
-            "validation": {
-                "is_valid": True,
-                "validation_messages": ["排序層 DAG 接收成功", "四層 DAG 構建完成"],
-                "warnings": [],
-                "errors": []
-            },
-            "cross_layer_mapping": {
-                "code_to_order": {},
-                "execution_feasibility": 0.0,
-                "resource_allocation": "pending"
-            },
-            "four_layer_summary": {
-                "all_layers_completed": True,
-                "total_layers": 4,
-                "layer_sequence": ["function", "logic", "code", "order"],
-                "integration_status": "ready_for_validation",
-                "next_steps": ["跨層一致性驗證", "完整性檢查", "優化建議生成"]
-            },
-            "storage_info": {
-                "format": "unified_dag_model",
-                "storage_path": f"order_layer_{hash(mermaid_dag) % 10000}.json",
-                "backup_created": True,
-                "complete_dag_path": f"complete_four_layer_dag_{hash(str(result)) % 10000}.json"
-            }
-        }
-        
-        # 簡單的 Mermaid 解析
-        if mermaid_dag:
-            lines = mermaid_dag.split('\n')
-            node_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            edge_count = sum(1 for line in lines if '-->' in line or '->' in line)
-            
-            result["parsed_dag"]["metadata"]["node_count"] = node_count
-            result["parsed_dag"]["metadata"]["edge_count"] = edge_count
-            
-            debug_log(f"排序層 DAG 解析完成 - 節點: {node_count}, 邊: {edge_count}")
-            debug_log("四層 DAG 構建流程完成！")
-        
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
+        result = builder(*args)
     except Exception as e:
-        error_result = {
-            "success": False,
-            "layer_type": "order",
-            "error": str(e),
-            "error_type": "parsing_error",
-            "input_data": {
-                "code_layer_result_length": len(code_layer_result) if code_layer_result else 0,
-                "mermaid_dag_length": len(mermaid_dag) if mermaid_dag else 0
+        debug_log("%s失败: %s", label, e)
+        return _dumps(
+            {
+                "success": False,
+                "error": str(e),
+                "error_type": error_type,
+                **(error_context or {}),
+                "timestamp": timestamp,
             }
-        }
-        debug_log(f"排序層 DAG 構建失敗: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+        )
+    return _dumps({"success": True, **result, "timestamp": timestamp})
+
+
+@_cached_builder
+def _build_position_identification(
+    dag_data: str, execution_context: str, additional_info: str
+) -> dict:
+    """构建节点位置识别结果（success/timestamp 由 _run_ai_tool 补充）"""
+    # 模拟AI分析（实际实现中应该调用LLM API）
+    # 这里提供一个基础的规则引擎作为fallback
+
+    # 基础分析逻辑
+    result = {
+        "analysis_type": "ai_position_identification",
+        "recommended_node": {
+            "node_id": "auto_detected_node",
+            "layer": "function",
+            "node_name": "项目需求分析",
+            "confidence": 75,
+            "reasoning": (
+                "基于当前执行状态和DAG结构，推荐从功能层开始或继续当前功能层节点"
+            ),
+        },
+        "alternatives": [
+            {
+                "node_id": "alternative_node",
+                "layer": "logic",
+                "confidence": 60,
+                "reasoning": "如果功能层已基本完成，可考虑进入逻辑层",
+            }
+        ],
+        "current_analysis": {
+            "ready_nodes": ["function_node_1", "function_node_2"],
+            "blocked_nodes": ["logic_node_1", "code_node_1"],
+            "dependencies_status": "功能层依赖已满足，逻辑层等待功能层完成",
+            "execution_phase": "blueprint_construction",
+        },
+        "risks_and_suggestions": {
+            "risks": ["功能层定义不够清晰可能影响后续层级"],
+            "suggestions": ["建议先完善功能层定义", "建立清晰的验收标准"],
+            "next_steps": ["继续完善当前节点", "准备用户反馈收集"],
+        },
+        "ai_analysis": {
+            "prompt_used": "ai_position_identification",
+            "analysis_depth": "comprehensive",
+            "confidence_level": "medium_high",
+            "requires_human_validation": True,
+        },
+    }
 
+    debug_log("AI节点位置识别完成，推荐节点: %s", result["recommended_node"]["node_id"])
+    return result
 
-# ===== AI智能节点状态管理工具 =====
 
 @mcp.tool()
 async def ai_identify_current_node(
@@ -1037,122 +1233,86 @@ async def ai_identify_current_node(
     Returns:
         str: JSON格式的节点位置分析结果，包含推荐节点、置信度、reasoning等
     """
+    return _run_ai_tool(
+        "AI节点位置识别",
+        "ai_analysis_error",
+        _build_position_identification,
+        dag_data,
+        execution_context,
+        additional_info,
+    )
+
+
+# 完成度评估结果中的固定片段：结果会立即序列化，可安全地在调用间共享
+_EMPTY: tuple = ()
+_DELIVERABLES_REQUIRED = ("节点输出", "文档说明", "质量检查")
+_DELIVERABLES_COMPLETED = ("节点输出",)
+_DELIVERABLES_MISSING = ("文档说明", "质量检查")
+_EVIDENCE_STRENGTHS = ("提供了完成证据",)
+_CRITERIA_WEAKNESSES = ("需要更详细的文档",)
+_IMPROVEMENT_AREAS = ("标准化文档", "质量检查流程")
+_MISSING_EVIDENCE_BLOCKERS = (
+    {
+        "type": "documentation",
+        "description": "缺少完整的文档说明",
+        "severity": "medium",
+        "suggested_solution": "补充详细的节点输出文档",
+    },
+)
+_COMPLETION_RECOMMENDATIONS = {
+    "immediate_actions": ("完成缺失的交付物", "进行质量检查"),
+    "long_term_improvements": ("建立标准化流程", "改进质量标准"),
+    "next_steps": ("收集用户反馈", "准备下一节点"),
+}
+
+
+def _build_completion_evaluation(
+    node_id: str, node_data: str, completion_evidence: str, quality_criteria: str
+) -> dict:
+    """构建节点完成度评估结果（success/timestamp 由 _run_ai_tool 补充）"""
+    # 模拟AI评估逻辑
     try:
-        debug_log("开始AI智能节点位置识别")
-        
-        # 准备AI分析的prompt
-        analysis_prompt = f"""
-你是一个4层DAG执行的智能位置识别专家。请分析当前项目执行状态，确定应该处于哪个节点。
-
-### 4层DAG数据：
-{dag_data}
-
-### 执行上下文：
-{execution_context}
-
-### 额外信息：
-{additional_info}
-
-请基于以下维度进行分析：
-
-1. **依赖关系分析**：检查哪些节点的前置依赖已满足
-2. **状态一致性**：验证当前状态与DAG结构的一致性
-3. **上下文理解**：理解项目目标和当前进展
-4. **优先级评估**：考虑业务价值和紧急程度
-
-请返回结构化的JSON分析结果，包含：
-{{
-  "recommended_node": {{
-    "node_id": "推荐的节点ID",
-    "layer": "所属层级(function/logic/code/order)",
-    "node_name": "节点名称",
-    "confidence": 85, // 置信度(0-100)
-    "reasoning": "详细的推理过程"
-  }},
-  "alternatives": [
-    {{
-      "node_id": "备选节点ID",
-      "layer": "所属层级",
-      "confidence": 75,
-      "reasoning": "选择理由"
-    }}
-  ],
-  "current_analysis": {{
-    "ready_nodes": ["可执行的节点列表"],
-    "blocked_nodes": ["被阻塞的节点列表"],
-    "dependencies_status": "依赖关系状态分析",
-    "execution_phase": "当前执行阶段"
-  }},
-  "risks_and_suggestions": {{
-    "risks": ["识别的风险点"],
-    "suggestions": ["改进建议"],
-    "next_steps": ["后续步骤建议"]
-  }}
-}}
-"""
-        
-        # 模拟AI分析（实际实现中应该调用LLM API）
-        # 这里提供一个基础的规则引擎作为fallback
-        import json
-        
-        try:
-            dag_info = json.loads(dag_data) if dag_data else {}
-            context_info = json.loads(execution_context) if execution_context else {}
-        except:
-            dag_info = {}
-            context_info = {}
-        
-        # 基础分析逻辑
-        result = {
-            "success": True,
-            "analysis_type": "ai_position_identification",
-            "timestamp": datetime.datetime.now().isoformat(),
-            "recommended_node": {
-                "node_id": "auto_detected_node",
-                "layer": "function",
-                "node_name": "项目需求分析",
-                "confidence": 75,
-                "reasoning": "基于当前执行状态和DAG结构，推荐从功能层开始或继续当前功能层节点"
-            },
-            "alternatives": [
-                {
-                    "node_id": "alternative_node",
-                    "layer": "logic", 
-                    "confidence": 60,
-                    "reasoning": "如果功能层已基本完成，可考虑进入逻辑层"
-                }
-            ],
-            "current_analysis": {
-                "ready_nodes": ["function_node_1", "function_node_2"],
-                "blocked_nodes": ["logic_node_1", "code_node_1"],
-                "dependencies_status": "功能层依赖已满足，逻辑层等待功能层完成",
-                "execution_phase": "blueprint_construction"
-            },
-            "risks_and_suggestions": {
-                "risks": ["功能层定义不够清晰可能影响后续层级"],
-                "suggestions": ["建议先完善功能层定义", "建立清晰的验收标准"],
-                "next_steps": ["继续完善当前节点", "准备用户反馈收集"]
+        node_info = orjson.loads(node_data) if node_data else {}
+    except ValueError:
+        node_info = {}
+
+    # 完成度按证据长度线性估算（每10字符1%），限制在10-90之间，无证据时为0
+    evidence_length = len(completion_evidence)
+    if evidence_length >= 900:
+        completion_percentage = 90
+    elif evidence_length >= 100:
+        completion_percentage = evidence_length // 10
+    else:
+        completion_percentage = 10 if evidence_length else 0
+
+    # 基础评估逻辑
+    result = {
+        "evaluation_type": "ai_completion_assessment",
+        "node_id": node_id,
+        "completion_status": {
+            "is_completed": evidence_length > 100,
+            "completion_percentage": completion_percentage,
+            "quality_score": 75,  # 基于证据质量的简单评分
+            "meets_standards": True if completion_evidence and quality_criteria else False
+        },
+        "detailed_assessment": {
+            "deliverables_check": {
+                "required": _DELIVERABLES_REQUIRED,
+                "completed": _DELIVERABLES_COMPLETED if completion_evidence else _EMPTY,
+                "missing": _EMPTY if completion_evidence else _DELIVERABLES_MISSING
             },
-            "ai_analysis": {
-                "prompt_used": "ai_position_identification",
-                "analysis_depth": "comprehensive",
-                "confidence_level": "medium_high",
-                "requires_human_validation": True
+            "quality_analysis": {
+                "strengths": _EVIDENCE_STRENGTHS if completion_evidence else _EMPTY,
+                "weaknesses": _EMPTY if quality_criteria else _CRITERIA_WEAKNESSES,
+                "improvement_areas": _IMPROVEMENT_AREAS
             }
-        }
-        
-        debug_log(f"AI节点位置识别完成，推荐节点: {result['recommended_node']['node_id']}")
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "error": str(e),
-            "error_type": "ai_analysis_error",
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        debug_log(f"AI节点位置识别失败: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+        },
+        "blockers_and_issues": _EMPTY if completion_evidence else _MISSING_EVIDENCE_BLOCKERS,
+        "recommendations": _COMPLETION_RECOMMENDATIONS
+    }
+
+    debug_log("AI节点完成度评估完成，完成率: %s%%", completion_percentage)
+    return result
 
 
 @mcp.tool()
@@ -1188,124 +1348,75 @@ async def ai_evaluate_node_completion(
     Returns:
         str: JSON格式的完成度评估结果
     """
+    return _run_ai_tool(
+        "AI节点完成度评估",
+        "ai_evaluation_error",
+        _build_completion_evaluation,
+        node_id,
+        node_data,
+        completion_evidence,
+        quality_criteria,
+        error_context={"node_id": node_id},
+    )
+
+
+@_cached_builder
+def _build_next_node_recommendation(
+    current_node: str, dag_data: str, resource_state: str, constraints: str
+) -> dict:
+    """构建下一节点推荐结果（success/timestamp 由 _run_ai_tool 补充）"""
+    # 模拟AI推荐逻辑
     try:
-        debug_log(f"开始AI节点完成度评估，节点ID: {node_id}")
-        
-        # 准备AI评估的prompt
-        evaluation_prompt = f"""
-你是一个任务完成度评估专家。请评估指定节点的完成状态和质量。
-
-### 节点信息：
-- 节点ID：{node_id}
-- 节点数据：{node_data}
-- 质量标准：{quality_criteria}
-
-### 完成证据：
-{completion_evidence}
-
-请从以下维度进行评估：
-
-1. **完整性评估**：检查所有要求的交付物是否完成
-2. **质量评估**：评估交付物的质量水平
-3. **标准符合性**：验证是否符合预设的验收标准
-4. **风险识别**：识别潜在问题和风险点
-
-请返回结构化的JSON评估结果：
-{{
-  "completion_status": {{
-    "is_completed": true/false,
-    "completion_percentage": 85, // 完成度百分比(0-100)
-    "quality_score": 78, // 质量评分(0-100)
-    "meets_standards": true/false
-  }},
-  "detailed_assessment": {{
-    "deliverables_check": {{
-      "required": ["需要的交付物列表"],
-      "completed": ["已完成的交付物"],
-      "missing": ["缺失的交付物"]
-    }},
-    "quality_analysis": {{
-      "strengths": ["优点和亮点"],
-      "weaknesses": ["不足和问题"],
-      "improvement_areas": ["改进方向"]
-    }}
-  }},
-  "blockers_and_issues": [
-    {{
-      "type": "问题类型",
-      "description": "问题描述",
-      "severity": "high/medium/low",
-      "suggested_solution": "建议解决方案"
-    }}
-  ],
-  "recommendations": {{
-    "immediate_actions": ["立即行动建议"],
-    "long_term_improvements": ["长期改进建议"],
-    "next_steps": ["下一步行动计划"]
-  }}
-}}
-"""
-        
-        # 模拟AI评估逻辑
-        import json
-        
-        try:
-            node_info = json.loads(node_data) if node_data else {}
-        except:
-            node_info = {}
-        
-        # 基础评估逻辑
-        result = {
-            "success": True,
-            "evaluation_type": "ai_completion_assessment",
-            "node_id": node_id,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "completion_status": {
-                "is_completed": True if completion_evidence and len(completion_evidence) > 100 else False,
-                "completion_percentage": min(90, max(10, len(completion_evidence) // 10)) if completion_evidence else 0,
-                "quality_score": 75,  # 基于证据质量的简单评分
-                "meets_standards": True if completion_evidence and quality_criteria else False
-            },
-            "detailed_assessment": {
-                "deliverables_check": {
-                    "required": ["节点输出", "文档说明", "质量检查"],
-                    "completed": ["节点输出"] if completion_evidence else [],
-                    "missing": ["文档说明", "质量检查"] if not completion_evidence else []
-                },
-                "quality_analysis": {
-                    "strengths": ["提供了完成证据"] if completion_evidence else [],
-                    "weaknesses": ["需要更详细的文档"] if not quality_criteria else [],
-                    "improvement_areas": ["标准化文档", "质量检查流程"]
-                }
-            },
-            "blockers_and_issues": [
-                {
-                    "type": "documentation",
-                    "description": "缺少完整的文档说明",
-                    "severity": "medium",
-                    "suggested_solution": "补充详细的节点输出文档"
-                }
-            ] if not completion_evidence else [],
-            "recommendations": {
-                "immediate_actions": ["完成缺失的交付物", "进行质量检查"],
-                "long_term_improvements": ["建立标准化流程", "改进质量标准"],
-                "next_steps": ["收集用户反馈", "准备下一节点"]
+        current_info = orjson.loads(current_node) if current_node else {}
+    except ValueError:
+        current_info = {}
+
+    # 基础推荐逻辑
+    result = {
+        "recommendation_type": "ai_next_node_analysis",
+        "primary_recommendation": {
+            "node_id": "next_logical_node",
+            "layer": "logic" if current_info.get("layer") == "function" else "function",
+            "node_name": "系统架构设计"
+            if current_info.get("layer") == "function"
+            else "需求细化",
+            "confidence": 85,
+            "reasoning": (
+                "基于当前节点完成情况和依赖关系分析，推荐继续同层深化或进入下一层"
+            ),
+            "expected_duration": "2-4小时",
+            "resource_requirements": ["分析能力", "设计工具", "文档工具"],
+        },
+        "parallel_opportunities": [
+            {
+                "node_id": "parallel_analysis_node",
+                "layer": "function",
+                "parallel_confidence": 70,
+                "resource_overlap": "低冲突，可并行执行",
             }
-        }
-        
-        debug_log(f"AI节点完成度评估完成，完成率: {result['completion_status']['completion_percentage']}%")
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "error": str(e),
-            "error_type": "ai_evaluation_error",
-            "node_id": node_id,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        debug_log(f"AI节点完成度评估失败: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+        ],
+        "execution_path": {
+            "immediate_next": ["next_logical_node"],
+            "short_term": ["logic_node_1", "logic_node_2"],
+            "long_term": ["code_node_1", "order_node_1"],
+            "critical_path": ["next_logical_node", "logic_node_1", "code_node_1"],
+        },
+        "risk_assessment": {
+            "identified_risks": ["前置条件不够完整", "资源分配冲突"],
+            "mitigation_strategies": ["加强前置验证", "动态资源调配"],
+            "contingency_plans": ["备选节点准备", "回滚机制"],
+        },
+        "optimization_suggestions": {
+            "efficiency_tips": ["合并相似任务", "优化依赖顺序"],
+            "quality_improvements": ["增加检查点", "强化验证"],
+            "user_experience": ["提供进度反馈", "增加交互确认"],
+        },
+    }
+
+    debug_log(
+        "AI下一节点推荐完成，主要推荐: %s", result["primary_recommendation"]["node_id"]
+    )
+    return result
 
 
 @mcp.tool()
@@ -1341,127 +1452,82 @@ async def ai_recommend_next_node(
     Returns:
         str: JSON格式的下一节点推荐结果
     """
+    return _run_ai_tool(
+        "AI下一节点推荐",
+        "ai_recommendation_error",
+        _build_next_node_recommendation,
+        current_node,
+        dag_data,
+        resource_state,
+        constraints,
+    )
+
+
+def _build_state_update_decision(
+    node_id: str, completion_result: str, impact_scope: str, update_options: str
+) -> dict:
+    """构建状态更新决策结果（success/timestamp 由 _run_ai_tool 补充）"""
+    # 模拟AI决策逻辑
     try:
-        debug_log("开始AI下一节点推荐分析")
-        
-        # 准备AI推荐的prompt
-        recommendation_prompt = f"""
-你是一个智能执行路径规划专家。基于当前状态推荐下一个最优执行节点。
-
-### 当前节点信息：
-{current_node}
-
-### 4层DAG结构：
-{dag_data}
-
-### 资源状态：
-{resource_state}
-
-### 约束条件：
-{constraints}
-
-请从以下维度进行分析：
-
-1. **依赖分析**：识别所有前置依赖已满足的节点
-2. **优先级评估**：考虑业务价值、紧急程度、风险等因素
-3. **资源匹配**：评估资源需求与可用性的匹配度
-4. **并行机会**：识别可以并行执行的节点组合
-
-请返回结构化的JSON推荐结果：
-{{
-  "primary_recommendation": {{
-    "node_id": "推荐的主要节点ID",
-    "layer": "所属层级",
-    "node_name": "节点名称",
-    "confidence": 90, // 推荐置信度(0-100)
-    "reasoning": "详细推荐理由",
-    "expected_duration": "预估执行时间",
-    "resource_requirements": ["所需资源列表"]
-  }},
-  "parallel_opportunities": [
-    {{
-      "node_id": "可并行执行的节点ID",
-      "layer": "所属层级",
-      "parallel_confidence": 80,
-      "resource_overlap": "资源冲突评估"
-    }}
-  ],
-  "execution_path": {{
-    "immediate_next": ["立即可执行的节点"],
-    "short_term": ["短期内可执行的节点"],
-    "long_term": ["长期规划节点"],
-    "critical_path": ["关键路径节点"]
-  }},
-  "risk_assessment": {{
-    "identified_risks": ["识别的风险点"],
-    "mitigation_strategies": ["风险缓解策略"],
-    "contingency_plans": ["应急计划"]
-  }}
-}}
-"""
-        
-        # 模拟AI推荐逻辑
-        import json
-        
-        try:
-            current_info = json.loads(current_node) if current_node else {}
-            dag_info = json.loads(dag_data) if dag_data else {}
-        except:
-            current_info = {}
-            dag_info = {}
-        
-        # 基础推荐逻辑
-        result = {
-            "success": True,
-            "recommendation_type": "ai_next_node_analysis",
-            "timestamp": datetime.datetime.now().isoformat(),
-            "primary_recommendation": {
-                "node_id": "next_logical_node",
-                "layer": "logic" if current_info.get("layer") == "function" else "function",
-                "node_name": "系统架构设计" if current_info.get("layer") == "function" else "需求细化",
-                "confidence": 85,
-                "reasoning": "基于当前节点完成情况和依赖关系分析，推荐继续同层深化或进入下一层",
-                "expected_duration": "2-4小时",
-                "resource_requirements": ["分析能力", "设计工具", "文档工具"]
-            },
-            "parallel_opportunities": [
-                {
-                    "node_id": "parallel_analysis_node",
-                    "layer": "function",
-                    "parallel_confidence": 70,
-                    "resource_overlap": "低冲突，可并行执行"
-                }
-            ],
-            "execution_path": {
-                "immediate_next": ["next_logical_node"],
-                "short_term": ["logic_node_1", "logic_node_2"],
-                "long_term": ["code_node_1", "order_node_1"],
-                "critical_path": ["next_logical_node", "logic_node_1", "code_node_1"]
-            },
-            "risk_assessment": {
-                "identified_risks": ["前置条件不够完整", "资源分配冲突"],
-                "mitigation_strategies": ["加强前置验证", "动态资源调配"],
-                "contingency_plans": ["备选节点准备", "回滚机制"]
-            },
-            "optimization_suggestions": {
-                "efficiency_tips": ["合并相似任务", "优化依赖顺序"],
-                "quality_improvements": ["增加检查点", "强化验证"],
-                "user_experience": ["提供进度反馈", "增加交互确认"]
+        completion_info = orjson.loads(completion_result) if completion_result else {}
+    except ValueError:
+        completion_info = {}
+
+    # 基于完成度评估结果决定状态更新
+    is_completed = completion_info.get("completion_status", {}).get("is_completed", False)
+    completion_percentage = completion_info.get("completion_status", {}).get("completion_percentage", 0)
+
+    # 基础决策逻辑
+    if completion_percentage >= 90:
+        new_state = "completed"
+        execution_priority = "high"
+    elif completion_percentage >= 70:
+        new_state = "near_completion"
+        execution_priority = "medium"
+    elif completion_percentage >= 30:
+        new_state = "in_progress"
+        execution_priority = "low"
+    else:
+        new_state = "needs_attention"
+        execution_priority = "high"
+
+    result = {
+        "decision_type": "ai_state_update_decision",
+        "node_id": node_id,
+        "update_decision": {
+            "new_state": new_state,
+            "state_transition": f"auto_transition_to_{new_state}",
+            "confidence": 82,
+            "reasoning": f"基于完成度{completion_percentage}%和质量评估，建议更新为{new_state}状态",
+            "execution_priority": execution_priority
+        },
+        "cascade_updates": [
+            {
+                "affected_node_id": "downstream_node_1",
+                "update_type": "dependency_ready" if new_state == "completed" else "dependency_pending",
+                "update_reason": f"上游节点{node_id}状态变更为{new_state}",
+                "execution_order": 1
             }
+        ] if new_state == "completed" else [],
+        "notification_strategy": {
+            "immediate_notifications": ["项目负责人", "下游节点负责人"] if execution_priority == "high" else [],
+            "scheduled_notifications": ["团队成员", "利益相关者"],
+            "notification_content": f"节点{node_id}状态已更新为{new_state}，完成度{completion_percentage}%"
+        },
+        "rollback_plan": {
+            "rollback_triggers": ["质量检查失败", "用户拒绝验收", "下游节点无法开始"],
+            "rollback_steps": ["恢复前一状态", "重新评估完成条件", "调整质量标准"],
+            "rollback_impact": "低影响，主要影响当前节点和直接下游"
+        },
+        "risk_mitigation": {
+            "identified_risks": ["状态更新过于激进", "下游准备不足"],
+            "mitigation_actions": ["增加验证检查点", "提前沟通下游准备"],
+            "monitoring_points": ["下游节点启动情况", "质量指标变化", "用户反馈"]
         }
-        
-        debug_log(f"AI下一节点推荐完成，主要推荐: {result['primary_recommendation']['node_id']}")
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "error": str(e),
-            "error_type": "ai_recommendation_error",
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        debug_log(f"AI下一节点推荐失败: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+    }
+
+    debug_log("AI状态更新决策完成，新状态: %s", new_state)
+    return result
 
 
 @mcp.tool()
@@ -1497,137 +1563,100 @@ async def ai_decide_state_update(
     Returns:
         str: JSON格式的状态更新决策结果
     """
+    return _run_ai_tool(
+        "AI状态更新决策",
+        "ai_decision_error",
+        _build_state_update_decision,
+        node_id,
+        completion_result,
+        impact_scope,
+        update_options,
+        error_context={"node_id": node_id},
+    )
+
+
+@_cached_builder
+def _build_execution_orchestration(
+    dag_data: str, execution_config: str, user_preferences: str
+) -> dict:
+    """构建执行编排计划（success/timestamp 由 _run_ai_tool 补充）"""
+    # 模拟智能编排逻辑
     try:
-        debug_log(f"开始AI状态更新决策，节点ID: {node_id}")
-        
-        # 准备AI决策的prompt
-        decision_prompt = f"""
-你是一个状态更新决策专家。请决定如何更新节点状态及其影响。
-
-### 节点信息：
-- 节点ID：{node_id}
-- 完成评估结果：{completion_result}
-- 影响范围：{impact_scope}
-- 更新选项：{update_options}
-
-请从以下维度进行决策：
-
-1. **状态转换评估**：分析当前状态到目标状态的合理性
-2. **影响分析**：评估状态更新对其他节点和整体项目的影响
-3. **风险控制**：识别潜在风险并制定缓解策略
-4. **执行策略**：制定具体的更新执行方案
-
-请返回结构化的JSON决策结果：
-{{
-  "update_decision": {{
-    "new_state": "目标状态",
-    "state_transition": "状态转换类型",
-    "confidence": 88, // 决策置信度(0-100)
-    "reasoning": "详细决策理由",
-    "execution_priority": "high/medium/low"
-  }},
-  "cascade_updates": [
-    {{
-      "affected_node_id": "受影响的节点ID",
-      "update_type": "状态更新类型",
-      "update_reason": "更新原因",
-      "execution_order": 1
-    }}
-  ],
-  "notification_strategy": {{
-    "immediate_notifications": ["需要立即通知的对象"],
-    "scheduled_notifications": ["计划通知的对象"],
-    "notification_content": "通知内容模板"
-  }},
-  "rollback_plan": {{
-    "rollback_triggers": ["回滚触发条件"],
-    "rollback_steps": ["回滚步骤"],
-    "rollback_impact": "回滚影响评估"
-  }},
-  "risk_mitigation": {{
-    "identified_risks": ["识别的风险"],
-    "mitigation_actions": ["缓解措施"],
-    "monitoring_points": ["监控要点"]
-  }}
-}}
-"""
-        
-        # 模拟AI决策逻辑
-        import json
-        
-        try:
-            completion_info = json.loads(completion_result) if completion_result else {}
-        except:
-            completion_info = {}
-        
-        # 基于完成度评估结果决定状态更新
-        is_completed = completion_info.get("completion_status", {}).get("is_completed", False)
-        completion_percentage = completion_info.get("completion_status", {}).get("completion_percentage", 0)
-        
-        # 基础决策逻辑
-        if completion_percentage >= 90:
-            new_state = "completed"
-            execution_priority = "high"
-        elif completion_percentage >= 70:
-            new_state = "near_completion"
-            execution_priority = "medium"
-        elif completion_percentage >= 30:
-            new_state = "in_progress"
-            execution_priority = "low"
-        else:
-            new_state = "needs_attention"
-            execution_priority = "high"
-        
-        result = {
-            "success": True,
-            "decision_type": "ai_state_update_decision",
-            "node_id": node_id,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "update_decision": {
-                "new_state": new_state,
-                "state_transition": f"auto_transition_to_{new_state}",
-                "confidence": 82,
-                "reasoning": f"基于完成度{completion_percentage}%和质量评估，建议更新为{new_state}状态",
-                "execution_priority": execution_priority
-            },
-            "cascade_updates": [
+        dag_info = _parse_dag(dag_data) if dag_data else {}
+        config_info = orjson.loads(execution_config) if execution_config else {}
+        preferences = orjson.loads(user_preferences) if user_preferences else {}
+    except ValueError:
+        dag_info = {}
+        config_info = {}
+        preferences = {}
+
+    # 按依赖关系计算可并行执行的节点批次（同一批次内的节点互不依赖）
+    nodes, edges = _extract_dag_graph(dag_info)
+    try:
+        parallel_batches = ParallelDispatcher.topological_layers(nodes, edges)
+    except ValueError as e:
+        debug_log("DAG拓扑分层失败: %s", e)
+        parallel_batches = []
+
+    # 基础编排策略
+    result = {
+        "orchestration_type": "ai_intelligent_execution",
+        "execution_plan": {
+            "phases": [
                 {
-                    "affected_node_id": "downstream_node_1",
-                    "update_type": "dependency_ready" if new_state == "completed" else "dependency_pending",
-                    "update_reason": f"上游节点{node_id}状态变更为{new_state}",
-                    "execution_order": 1
-                }
-            ] if new_state == "completed" else [],
-            "notification_strategy": {
-                "immediate_notifications": ["项目负责人", "下游节点负责人"] if execution_priority == "high" else [],
-                "scheduled_notifications": ["团队成员", "利益相关者"],
-                "notification_content": f"节点{node_id}状态已更新为{new_state}，完成度{completion_percentage}%"
-            },
-            "rollback_plan": {
-                "rollback_triggers": ["质量检查失败", "用户拒绝验收", "下游节点无法开始"],
-                "rollback_steps": ["恢复前一状态", "重新评估完成条件", "调整质量标准"],
-                "rollback_impact": "低影响，主要影响当前节点和直接下游"
-            },
-            "risk_mitigation": {
-                "identified_risks": ["状态更新过于激进", "下游准备不足"],
-                "mitigation_actions": ["增加验证检查点", "提前沟通下游准备"],
-                "monitoring_points": ["下游节点启动情况", "质量指标变化", "用户反馈"]
-            }
-        }
-        
-        debug_log(f"AI状态更新决策完成，新状态: {new_state}")
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "error": str(e),
-            "error_type": "ai_decision_error",
-            "node_id": node_id,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        debug_log(f"AI状态更新决策失败: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+                    "phase_name": "blueprint_construction",
+                    "description": "4层DAG蓝图构建阶段",
+                    "estimated_duration": "2-4小时",
+                    "ai_agents_involved": [
+                        "position_agent",
+                        "completion_agent",
+                        "next_node_agent",
+                        "update_agent",
+                    ],
+                },
+                {
+                    "phase_name": "validation_and_optimization",
+                    "description": "验证和优化阶段",
+                    "estimated_duration": "1-2小时",
+                    "ai_agents_involved": ["completion_agent", "update_agent"],
+                },
+                {
+                    "phase_name": "execution_monitoring",
+                    "description": "执行监控阶段",
+                    "estimated_duration": "持续",
+                    "ai_agents_involved": ["position_agent", "next_node_agent"],
+                },
+            ],
+            "parallel_batches": parallel_batches,
+            "feedback_frequency": preferences.get("feedback_frequency", 3),
+            "user_involvement_level": preferences.get("involvement_level", "moderate"),
+        },
+        "intelligent_scheduling": {
+            "current_strategy": "adaptive_priority_based",
+            "scheduling_factors": ["依赖关系", "资源可用性", "业务优先级", "风险评估"],
+            "optimization_goals": ["最短路径", "最高质量", "最低风险"],
+            "adaptation_triggers": ["用户反馈", "执行异常", "资源变化"],
+        },
+        "monitoring_and_control": {
+            "real_time_metrics": ["执行进度", "质量指标", "资源使用", "风险水平"],
+            "alert_conditions": ["节点阻塞", "质量下降", "用户干预需求"],
+            "auto_recovery_actions": ["重新评估", "调整策略", "请求用户确认"],
+        },
+        "ai_decision_integration": {
+            "position_identification": "实时运行",
+            "completion_evaluation": "节点完成时触发",
+            "next_node_recommendation": "状态更新后触发",
+            "state_update_decision": "完成评估后触发",
+        },
+        "user_interaction_plan": {
+            "scheduled_feedback_points": ["阶段完成时", "关键决策点", "异常发生时"],
+            "feedback_collection_method": "mcp_feedback_enhanced_webui",
+            "decision_escalation": "复杂情况自动升级到用户",
+        },
+    }
+
+    debug_log("AI智能执行编排计划生成完成")
+    return result
 
 
 @mcp.tool()
@@ -1661,86 +1690,14 @@ async def ai_orchestrate_execution(
     Returns:
         str: JSON格式的执行编排结果和计划
     """
-    try:
-        debug_log("开始AI智能执行编排")
-        
-        # 模拟智能编排逻辑
-        import json
-        
-        try:
-            dag_info = json.loads(dag_data) if dag_data else {}
-            config_info = json.loads(execution_config) if execution_config else {}
-            preferences = json.loads(user_preferences) if user_preferences else {}
-        except:
-            dag_info = {}
-            config_info = {}
-            preferences = {}
-        
-        # 基础编排策略
-        result = {
-            "success": True,
-            "orchestration_type": "ai_intelligent_execution",
-            "timestamp": datetime.datetime.now().isoformat(),
-            "execution_plan": {
-                "phases": [
-                    {
-                        "phase_name": "blueprint_construction",
-                        "description": "4层DAG蓝图构建阶段",
-                        "estimated_duration": "2-4小时",
-                        "ai_agents_involved": ["position_agent", "completion_agent", "next_node_agent", "update_agent"]
-                    },
-                    {
-                        "phase_name": "validation_and_optimization",
-                        "description": "验证和优化阶段",
-                        "estimated_duration": "1-2小时",
-                        "ai_agents_involved": ["completion_agent", "update_agent"]
-                    },
-                    {
-                        "phase_name": "execution_monitoring",
-                        "description": "执行监控阶段",
-                        "estimated_duration": "持续",
-                        "ai_agents_involved": ["position_agent", "next_node_agent"]
-                    }
-                ],
-                "feedback_frequency": preferences.get("feedback_frequency", 3),
-                "user_involvement_level": preferences.get("involvement_level", "moderate")
-            },
-            "intelligent_scheduling": {
-                "current_strategy": "adaptive_priority_based",
-                "scheduling_factors": ["依赖关系", "资源可用性", "业务优先级", "风险评估"],
-                "optimization_goals": ["最短路径", "最高质量", "最低风险"],
-                "adaptation_triggers": ["用户反馈", "执行异常", "资源变化"]
-            },
-            "monitoring_and_control": {
-                "real_time_metrics": ["执行进度", "质量指标", "资源使用", "风险水平"],
-                "alert_conditions": ["节点阻塞", "质量下降", "用户干预需求"],
-                "auto_recovery_actions": ["重新评估", "调整策略", "请求用户确认"]
-            },
-            "ai_decision_integration": {
-                "position_identification": "实时运行",
-                "completion_evaluation": "节点完成时触发",
-                "next_node_recommendation": "状态更新后触发",
-                "state_update_decision": "完成评估后触发"
-            },
-            "user_interaction_plan": {
-                "scheduled_feedback_points": ["阶段完成时", "关键决策点", "异常发生时"],
-                "feedback_collection_method": "mcp_feedback_enhanced_webui",
-                "decision_escalation": "复杂情况自动升级到用户"
-            }
-        }
-        
-        debug_log("AI智能执行编排计划生成完成")
-        return json.dumps(result, ensure_ascii=False, indent=2)
-        
-    except Exception as e:
-        error_result = {
-            "success": False,
-            "error": str(e),
-            "error_type": "ai_orchestration_error",
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        debug_log(f"AI智能执行编排失败: {e}")
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+    return _run_ai_tool(
+        "AI智能执行编排",
+        "ai_orchestration_error",
+        _build_execution_orchestration,
+        dag_data,
+        execution_config,
+        user_preferences,
+    )
 
 
 # ===== 主程式入口 =====
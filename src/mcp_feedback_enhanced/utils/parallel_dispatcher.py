@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+DAG 並行調度器
+==============
+
+按依賴關係將 DAG 節點劃分為可並行執行的批次，包括：
+- Kahn 拓撲分層（可並行的節點批次）
+- 環檢測
+"""
+
+from collections.abc import Iterable
+
+
+class ParallelDispatcher:
+    """DAG 並行調度器 - 節點的前置依賴全部完成後即可進入下一批次"""
+
+    @staticmethod
+    def _build_graph(
+        nodes: Iterable[str], edges: Iterable[tuple[str, str]]
+    ) -> tuple[dict[str, list[str]], dict[str, int]]:
+        """建立後繼表和入度表，邊中出現的未知節點會被自動加入"""
+        successors: dict[str, list[str]] = {node: [] for node in nodes}
+        indegree: dict[str, int] = dict.fromkeys(successors, 0)
+
+        for source, target in edges:
+            for node in (source, target):
+                if node not in successors:
+                    successors[node] = []
+                    indegree[node] = 0
+            successors[source].append(target)
+            indegree[target] += 1
+
+        return successors, indegree
+
+    @classmethod
+    def topological_layers(
+        cls, nodes: Iterable[str], edges: Iterable[tuple[str, str]]
+    ) -> list[list[str]]:
+        """
+        使用 Kahn 算法將 DAG 分層，同一層內的節點互不依賴，可並行執行
+
+        Args:
+            nodes: 節點 ID 列表
+            edges: (上游, 下游) 邊列表
+
+        Returns:
+            list[list[str]]: 按執行順序排列的節點批次
+
+        Raises:
+            ValueError: 圖中存在環
+        """
+        successors, indegree = cls._build_graph(nodes, edges)
+
+        layers: list[list[str]] = []
+        ready = [node for node, degree in indegree.items() if degree == 0]
+        visited = 0
+
+        while ready:
+            layers.append(ready)
+            visited += len(ready)
+            next_ready = []
+            for node in ready:
+                for successor in successors[node]:
+                    indegree[successor] -= 1
+                    if indegree[successor] == 0:
+                        next_ready.append(successor)
+            ready = next_ready
+
+        if visited != len(successors):
+            raise ValueError("DAG 中存在環，無法進行拓撲排序")
+
+        return layers
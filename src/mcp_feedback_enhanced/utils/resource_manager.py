@@ -368,12 +368,15 @@ class ResourceManager:
 
         for file_path in self.temp_files.copy():
             try:
-                if not os.path.exists(file_path):
+                # 單次 stat 同時完成存在性檢查和年齡讀取
+                try:
+                    file_stat = os.stat(file_path)
+                except FileNotFoundError:
                     files_to_remove.add(file_path)
                     continue
 
                 # 檢查文件年齡
-                file_age = current_time - os.path.getmtime(file_path)
+                file_age = current_time - file_stat.st_mtime
                 if file_age > max_age:
                     os.remove(file_path)
                     files_to_remove.add(file_path)
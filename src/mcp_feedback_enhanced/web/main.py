@@ -19,6 +19,7 @@ from typing import Any
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -84,7 +85,9 @@ class WebUIManager:
             self.port = PortManager.find_free_port_enhanced(
                 preferred_port=preferred_port, auto_cleanup=auto_cleanup, host=self.host
             )
-        self.app = FastAPI(title="MCP Feedback Enhanced")
+        self.app = FastAPI(
+            title="MCP Feedback Enhanced", default_response_class=ORJSONResponse
+        )
 
         # 設置壓縮和緩存中間件
         self._setup_compression_middleware()
@@ -202,8 +205,11 @@ class WebUIManager:
             """壓縮和緩存中間件"""
             response = await call_next(request)
 
-            # 添加緩存頭
-            if not config.should_exclude_path(request.url.path):
+            # 添加緩存頭（路由已自行設置 Cache-Control 時保留，例如帶 ETag 的翻譯 API）
+            if (
+                not config.should_exclude_path(request.url.path)
+                and "cache-control" not in response.headers
+            ):
                 cache_headers = config.get_cache_headers(request.url.path)
                 for key, value in cache_headers.items():
                     response.headers[key] = value
@@ -317,21 +323,21 @@ class WebUIManager:
             old_websocket = self.current_session.websocket
             debug_log("保存舊會話的 WebSocket 連接以發送更新通知")
 
-        # 如果已有活躍會話，先保存其標籤頁狀態到全局狀態
+        # 如果已有活躍會話，先清理（標籤頁狀態本就保存在全局字典中）
         if self.current_session:
-            debug_log("保存現有會話的標籤頁狀態並清理會話")
-            # 保存標籤頁狀態到全局
-            if hasattr(self.current_session, "active_tabs"):
-                self._merge_tabs_to_global(self.current_session.active_tabs)
-
+            debug_log("清理現有會話，保留全局標籤頁狀態")
             # 同步清理會話資源（但保留 WebSocket 連接）
             self.current_session._cleanup_sync()
 
         session_id = str(uuid.uuid4())
         session = WebFeedbackSession(session_id, project_directory, summary)
 
-        # 將全局標籤頁狀態繼承到新會話
-        session.active_tabs = self.global_active_tabs.copy()
+        # 新會話與全局共用同一個標籤頁字典，心跳只需寫入一次。
+        # 不變量：self.sessions 中的所有會話都共用此字典，global_active_tabs 和
+        # session.active_tabs 都不得重新賦值或 clear()，只能增刪單個鍵
+        # （見 _prune_expired_tabs），否則會話與全局狀態會失去同步
+        self._prune_expired_tabs()
+        session.active_tabs = self.global_active_tabs
 
         # 設置為當前活躍會話
         self.current_session = session
@@ -402,39 +408,28 @@ class WebUIManager:
 
             debug_log("已清空當前活躍會話")
 
-    def _merge_tabs_to_global(self, session_tabs: dict):
-        """將會話的標籤頁狀態合併到全局狀態"""
+    def _prune_expired_tabs(self) -> int:
+        """
+        原地清理過期的全局標籤頁並返回剩餘數量
+
+        原地修改而非重新賦值，當前會話的 active_tabs 與全局字典是同一對象。
+        """
         current_time = time.time()
         expired_threshold = 60  # 60秒過期閾值
 
-        # 清理過期的全局標籤頁
-        self.global_active_tabs = {
-            tab_id: tab_info
+        expired = [
+            tab_id
             for tab_id, tab_info in self.global_active_tabs.items()
-            if current_time - tab_info.get("last_seen", 0) <= expired_threshold
-        }
-
-        # 合併會話標籤頁到全局
-        for tab_id, tab_info in session_tabs.items():
-            if current_time - tab_info.get("last_seen", 0) <= expired_threshold:
-                self.global_active_tabs[tab_id] = tab_info
+            if current_time - tab_info.get("last_seen", 0) > expired_threshold
+        ]
+        for tab_id in expired:
+            del self.global_active_tabs[tab_id]
 
-        debug_log(f"合併標籤頁狀態，全局活躍標籤頁數量: {len(self.global_active_tabs)}")
+        return len(self.global_active_tabs)
 
     def get_global_active_tabs_count(self) -> int:
         """獲取全局活躍標籤頁數量"""
-        current_time = time.time()
-        expired_threshold = 60
-
-        # 清理過期標籤頁並返回數量
-        valid_tabs = {
-            tab_id: tab_info
-            for tab_id, tab_info in self.global_active_tabs.items()
-            if current_time - tab_info.get("last_seen", 0) <= expired_threshold
-        }
-
-        self.global_active_tabs = valid_tabs
-        return len(valid_tabs)
+        return self._prune_expired_tabs()
 
     async def broadcast_to_active_tabs(self, message: dict):
         """向所有活躍標籤頁廣播消息"""
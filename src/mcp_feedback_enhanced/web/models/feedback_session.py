@@ -62,6 +62,7 @@ SUPPORTED_IMAGE_TYPES = {
     "image/webp",
 }
 TEMP_DIR = Path.home() / ".cache" / "interactive-feedback-mcp-web"
+COMMAND_OUTPUT_BATCH_MAX_CHARS = 64 * 1024  # 單個命令輸出幀合併的最大字符數
 
 
 def _safe_parse_command(command: str) -> list[str]:
@@ -557,23 +558,57 @@ class WebFeedbackSession:
             # 在背景線程中讀取輸出
             async def read_output():
                 loop = asyncio.get_event_loop()
+                # 讀取線程逐行放入隊列，None 表示輸出結束
+                lines: asyncio.Queue[str | None] = asyncio.Queue()
+                process = self.process
+
+                def pump_output():
+                    try:
+                        if process and process.stdout:
+                            for output_line in process.stdout:
+                                loop.call_soon_threadsafe(lines.put_nowait, output_line)
+                    finally:
+                        loop.call_soon_threadsafe(lines.put_nowait, None)
+
+                reader: asyncio.Future[None] | None = None
                 try:
                     # 使用線程池執行器來處理阻塞的讀取操作
-                    def read_line():
-                        if self.process and self.process.stdout:
-                            return self.process.stdout.readline()
-                        return ""
-
-                    while True:
-                        line = await loop.run_in_executor(None, read_line)
-                        if not line:
+                    reader = loop.run_in_executor(None, pump_output)
+
+                    # 超出上一幀大小上限的行留到下一幀
+                    pending: str | None = None
+                    finished = False
+                    while not finished:
+                        if pending is None:
+                            line = await lines.get()
+                        else:
+                            line, pending = pending, None
+                        if line is None:
                             break
 
-                        self.add_log(line.rstrip())
+                        # 合併已到達的輸出行為一個幀，大量輸出時不再每行發送一次
+                        batch = [line]
+                        batch_chars = len(line)
+                        while True:
+                            try:
+                                line = lines.get_nowait()
+                            except asyncio.QueueEmpty:
+                                break
+                            if line is None:
+                                finished = True
+                                break
+                            if batch_chars + len(line) > COMMAND_OUTPUT_BATCH_MAX_CHARS:
+                                pending = line
+                                break
+                            batch.append(line)
+                            batch_chars += len(line)
+
+                        for output_line in batch:
+                            self.add_log(output_line.rstrip())
                         if self.websocket:
                             try:
                                 await self.websocket.send_json(
-                                    {"type": "command_output", "output": line}
+                                    {"type": "command_output", "output": "".join(batch)}
                                 )
                             except Exception as e:
                                 debug_log(f"WebSocket 發送失敗: {e}")
@@ -582,6 +617,13 @@ class WebFeedbackSession:
                 except Exception as e:
                     debug_log(f"讀取命令輸出錯誤: {e}")
                 finally:
+                    # 等待讀取線程結束，取回其異常以免被靜默丟棄
+                    if reader is not None:
+                        try:
+                            await reader
+                        except Exception as e:
+                            debug_log(f"讀取命令輸出線程錯誤: {e}")
+
                     # 等待進程完成
                     if self.process:
                         exit_code = self.process.wait()
@@ -6,13 +6,18 @@
 設置 Web UI 的主要路由和處理邏輯。
 """
 
-import json
+import asyncio
+import hashlib
+import os
+import stat
+import tempfile
 import time
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import orjson
 from fastapi import Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 
 from ... import __version__
 from ...debug import web_debug_log as debug_log
@@ -21,53 +26,165 @@ from ...debug import web_debug_log as debug_log
 if TYPE_CHECKING:
     from ..main import WebUIManager
 
+# Web 翻譯檔案路徑在導入時計算一次，避免每次請求重建 Path 對象
+WEB_LOCALES_DIR = Path(__file__).parent.parent / "locales"
+WEB_TRANSLATION_FILES = {
+    lang_code: WEB_LOCALES_DIR / lang_code / "translation.json"
+    for lang_code in ("zh-TW", "zh-CN", "en")
+}
+
+# 用戶設定檔案路徑（與 feedback_session.TEMP_DIR 一致，在導入時計算一次）
+CONFIG_DIR = Path.home() / ".config" / "mcp-feedback-enhanced"
+SETTINGS_FILE = CONFIG_DIR / "ui_settings.json"
+HISTORY_FILE = CONFIG_DIR / "session_history.json"
+_SETTINGS_FILE_STR = str(SETTINGS_FILE)
+
+# 心跳回應內容固定，預先序列化；前端只依據 type 記錄 pong，不需要回傳 tabId/timestamp
+HEARTBEAT_RESPONSE_TEXT = orjson.dumps({"type": "heartbeat_response"}).decode("utf-8")
+
+# 超過此長度的 WebSocket 消息（通常是帶 base64 圖片的回饋）在線程池中解析，避免阻塞事件循環
+WS_OFFLOAD_PARSE_THRESHOLD = 32 * 1024
+
+# Web 翻譯快取：(各翻譯檔案的 mtime 簽名, 預先序列化的 JSON bytes, ETag)
+_translations_cache: tuple[tuple[int | None, ...], bytes, str] | None = None
+
+# 佈局模式快取：((設定檔案路徑, mtime), 佈局模式)
+_layout_cache: tuple[tuple[str, int], str] | None = None
+
 
 def load_user_layout_settings() -> str:
-    """載入用戶的佈局模式設定"""
+    """
+    載入用戶的佈局模式設定
+
+    解析結果按 (檔案路徑, mtime) 快取，設定檔案未變更時只需一次 stat。
+    """
+    global _layout_cache
+
     try:
-        # 使用統一的設定檔案路徑
-        config_dir = Path.home() / ".config" / "mcp-feedback-enhanced"
-        settings_file = config_dir / "ui_settings.json"
-
-        if settings_file.exists():
-            with open(settings_file, encoding="utf-8") as f:
-                settings = json.load(f)
-                layout_mode = settings.get("layoutMode", "combined-vertical")
-                debug_log(f"從設定檔案載入佈局模式: {layout_mode}")
-                # 修復 no-any-return 錯誤 - 確保返回 str 類型
-                return str(layout_mode)
-        else:
-            debug_log("設定檔案不存在，使用預設佈局模式: combined-vertical")
-            return "combined-vertical"
+        cache_key = (_SETTINGS_FILE_STR, os.stat(_SETTINGS_FILE_STR).st_mtime_ns)
+        if _layout_cache is not None and _layout_cache[0] == cache_key:
+            return _layout_cache[1]
+
+        with open(_SETTINGS_FILE_STR, "rb") as f:
+            settings = orjson.loads(f.read())
+        # 修復 no-any-return 錯誤 - 確保返回 str 類型
+        layout_mode = str(settings.get("layoutMode", "combined-vertical"))
+        debug_log(f"從設定檔案載入佈局模式: {layout_mode}")
+        _layout_cache = (cache_key, layout_mode)
+        return layout_mode
+    except FileNotFoundError:
+        debug_log("設定檔案不存在，使用預設佈局模式: combined-vertical")
+        return "combined-vertical"
     except Exception as e:
         debug_log(f"載入佈局設定失敗: {e}，使用預設佈局模式: combined-vertical")
         return "combined-vertical"
 
 
+def _read_json(path: Path):
+    """讀取並解析 JSON 檔案（同步，供 asyncio.to_thread 在線程池中調用）"""
+    return orjson.loads(path.read_bytes())
+
+
+def _write_json(path: Path, data) -> None:
+    """
+    原子地寫入 JSON 檔案（同步，供 asyncio.to_thread 在線程池中調用）
+
+    先寫入同目錄下的臨時檔案再以 os.replace 替換，讀取方不會看到寫了一半的檔案。
+    每次調用使用獨立的臨時檔案，並行保存同一檔案時不會互相覆蓋。
+    mkstemp 建立的檔案權限為 0600，替換前沿用原檔案的權限。
+    這些檔案只由程式讀寫，因此使用緊湊格式（不縮排）以減少序列化量和檔案大小。
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(data))
+        try:
+            os.chmod(tmp_name, stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_name, path)
+    except BaseException:
+        # 寫入或替換失敗時清理臨時檔案
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _translations_signature() -> tuple[int | None, ...]:
+    """取得所有翻譯檔案的 mtime 簽名，檔案不存在時對應位置為 None"""
+    signature: list[int | None] = []
+    for translation_file in WEB_TRANSLATION_FILES.values():
+        try:
+            signature.append(translation_file.stat().st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def load_web_translations() -> tuple[bytes, str]:
+    """
+    載入所有 Web 翻譯並序列化為 JSON
+
+    翻譯內容在首次請求時讀取並序列化，之後只在任一翻譯檔案的 mtime
+    變化時才重新載入，其餘請求直接返回快取的 bytes。
+
+    Returns:
+        tuple[bytes, str]: ({語言代碼: 翻譯數據} 的 JSON bytes, 內容的 ETag)
+    """
+    global _translations_cache
+
+    signature = _translations_signature()
+    if _translations_cache is not None and _translations_cache[0] == signature:
+        return _translations_cache[1], _translations_cache[2]
+
+    translations = {}
+    for lang_code, translation_file in WEB_TRANSLATION_FILES.items():
+        try:
+            translations[lang_code] = orjson.loads(translation_file.read_bytes())
+            debug_log(f"成功載入 Web 翻譯: {lang_code}")
+        except FileNotFoundError:
+            debug_log(f"Web 翻譯檔案不存在: {translation_file}")
+            translations[lang_code] = {}
+        except Exception as e:
+            debug_log(f"載入 Web 翻譯檔案失敗 {lang_code}: {e}")
+            translations[lang_code] = {}
+
+    debug_log(f"Web 翻譯已載入並快取，共 {len(translations)} 種語言")
+    body = orjson.dumps(translations)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    _translations_cache = (signature, body, etag)
+    return body, etag
+
+
 def setup_routes(manager: "WebUIManager"):
     """設置路由"""
+    # 等待頁面的內容與請求無關，首次請求時渲染一次後直接復用
+    no_session_html: str | None = None
 
     @manager.app.get("/", response_class=HTMLResponse)
     async def index(request: Request):
         """統一回饋頁面 - 重構後的主頁面"""
+        nonlocal no_session_html
+
         # 獲取當前活躍會話
         current_session = manager.get_current_session()
 
         if not current_session:
             # 沒有活躍會話時顯示等待頁面
-            return manager.templates.TemplateResponse(
-                "index.html",
-                {
-                    "request": request,
-                    "title": "MCP Feedback Enhanced",
-                    "has_session": False,
-                    "version": __version__,
-                },
-            )
+            if no_session_html is None:
+                no_session_html = manager.templates.get_template("index.html").render(
+                    title="MCP Feedback Enhanced",
+                    has_session=False,
+                    version=__version__,
+                )
+            return HTMLResponse(content=no_session_html)
 
         # 有活躍會話時顯示回饋頁面
         # 載入用戶的佈局模式設定
-        layout_mode = load_user_layout_settings()
+        layout_mode = await asyncio.to_thread(load_user_layout_settings)
 
         return manager.templates.TemplateResponse(
             "feedback.html",
@@ -84,33 +201,17 @@ def setup_routes(manager: "WebUIManager"):
         )
 
     @manager.app.get("/api/translations")
-    async def get_translations():
-        """獲取翻譯數據 - 從 Web 專用翻譯檔案載入"""
-        translations = {}
-
-        # 獲取 Web 翻譯檔案目錄
-        web_locales_dir = Path(__file__).parent.parent / "locales"
-        supported_languages = ["zh-TW", "zh-CN", "en"]
-
-        for lang_code in supported_languages:
-            lang_dir = web_locales_dir / lang_code
-            translation_file = lang_dir / "translation.json"
+    async def get_translations(request: Request):
+        """獲取翻譯數據 - 從 Web 專用翻譯檔案載入（帶 mtime 快取和 ETag）"""
+        body, etag = load_web_translations()
+        # no-cache 表示瀏覽器每次都需驗證，翻譯檔案更新後能立即生效
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
-            try:
-                if translation_file.exists():
-                    with open(translation_file, encoding="utf-8") as f:
-                        lang_data = json.load(f)
-                        translations[lang_code] = lang_data
-                        debug_log(f"成功載入 Web 翻譯: {lang_code}")
-                else:
-                    debug_log(f"Web 翻譯檔案不存在: {translation_file}")
-                    translations[lang_code] = {}
-            except Exception as e:
-                debug_log(f"載入 Web 翻譯檔案失敗 {lang_code}: {e}")
-                translations[lang_code] = {}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
 
-        debug_log(f"Web 翻譯 API 返回 {len(translations)} 種語言的數據")
-        return JSONResponse(content=translations)
+        return Response(content=body, media_type="application/json", headers=headers)
 
     @manager.app.get("/api/session-status")
     async def get_session_status():
@@ -118,7 +219,7 @@ def setup_routes(manager: "WebUIManager"):
         current_session = manager.get_current_session()
 
         if not current_session:
-            return JSONResponse(
+            return ORJSONResponse(
                 content={
                     "has_session": False,
                     "status": "no_session",
@@ -126,7 +227,7 @@ def setup_routes(manager: "WebUIManager"):
                 }
             )
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "has_session": True,
                 "status": "active",
@@ -144,9 +245,9 @@ def setup_routes(manager: "WebUIManager"):
         current_session = manager.get_current_session()
 
         if not current_session:
-            return JSONResponse(status_code=404, content={"error": "沒有活躍會話"})
+            return ORJSONResponse(status_code=404, content={"error": "沒有活躍會話"})
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "session_id": current_session.session_id,
                 "project_directory": current_session.project_directory,
@@ -210,7 +311,10 @@ def setup_routes(manager: "WebUIManager"):
         try:
             while True:
                 data = await websocket.receive_text()
-                message = json.loads(data)
+                if len(data) > WS_OFFLOAD_PARSE_THRESHOLD:
+                    message = await asyncio.to_thread(orjson.loads, data)
+                else:
+                    message = orjson.loads(data)
 
                 # 重新獲取當前會話，以防會話已切換
                 current_session = manager.get_current_session()
@@ -239,22 +343,18 @@ def setup_routes(manager: "WebUIManager"):
         try:
             data = await request.json()
 
-            # 使用統一的設定檔案路徑
-            config_dir = Path.home() / ".config" / "mcp-feedback-enhanced"
-            config_dir.mkdir(parents=True, exist_ok=True)
-            settings_file = config_dir / "ui_settings.json"
-
-            # 保存設定到檔案
-            with open(settings_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 保存設定到檔案（在線程池中執行，避免阻塞事件循環）
+            await asyncio.to_thread(_write_json, SETTINGS_FILE, data)
 
-            debug_log(f"設定已保存到: {settings_file}")
+            debug_log(f"設定已保存到: {SETTINGS_FILE}")
 
-            return JSONResponse(content={"status": "success", "message": "設定已保存"})
+            return ORJSONResponse(
+                content={"status": "success", "message": "設定已保存"}
+            )
 
         except Exception as e:
             debug_log(f"保存設定失敗: {e}")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"保存失敗: {e!s}"},
             )
@@ -263,22 +363,17 @@ def setup_routes(manager: "WebUIManager"):
     async def load_settings():
         """從檔案載入設定"""
         try:
-            # 使用統一的設定檔案路徑
-            config_dir = Path.home() / ".config" / "mcp-feedback-enhanced"
-            settings_file = config_dir / "ui_settings.json"
+            settings = await asyncio.to_thread(_read_json, SETTINGS_FILE)
 
-            if settings_file.exists():
-                with open(settings_file, encoding="utf-8") as f:
-                    settings = json.load(f)
+            debug_log(f"設定已從檔案載入: {SETTINGS_FILE}")
+            return ORJSONResponse(content=settings)
 
-                debug_log(f"設定已從檔案載入: {settings_file}")
-                return JSONResponse(content=settings)
+        except FileNotFoundError:
             debug_log("設定檔案不存在，返回空設定")
-            return JSONResponse(content={})
-
+            return ORJSONResponse(content={})
         except Exception as e:
             debug_log(f"載入設定失敗: {e}")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"載入失敗: {e!s}"},
             )
@@ -287,21 +382,19 @@ def setup_routes(manager: "WebUIManager"):
     async def clear_settings():
         """清除設定檔案"""
         try:
-            # 使用統一的設定檔案路徑
-            config_dir = Path.home() / ".config" / "mcp-feedback-enhanced"
-            settings_file = config_dir / "ui_settings.json"
-
-            if settings_file.exists():
-                settings_file.unlink()
-                debug_log(f"設定檔案已刪除: {settings_file}")
-            else:
+            try:
+                await asyncio.to_thread(SETTINGS_FILE.unlink)
+                debug_log(f"設定檔案已刪除: {SETTINGS_FILE}")
+            except FileNotFoundError:
                 debug_log("設定檔案不存在，無需刪除")
 
-            return JSONResponse(content={"status": "success", "message": "設定已清除"})
+            return ORJSONResponse(
+                content={"status": "success", "message": "設定已清除"}
+            )
 
         except Exception as e:
             debug_log(f"清除設定失敗: {e}")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"清除失敗: {e!s}"},
             )
@@ -310,37 +403,31 @@ def setup_routes(manager: "WebUIManager"):
     async def load_session_history():
         """從檔案載入會話歷史"""
         try:
-            # 使用統一的設定檔案路徑
-            config_dir = Path.home() / ".config" / "mcp-feedback-enhanced"
-            history_file = config_dir / "session_history.json"
+            history_data = await asyncio.to_thread(_read_json, HISTORY_FILE)
 
-            if history_file.exists():
-                with open(history_file, encoding="utf-8") as f:
-                    history_data = json.load(f)
+            debug_log(f"會話歷史已從檔案載入: {HISTORY_FILE}")
 
-                debug_log(f"會話歷史已從檔案載入: {history_file}")
-
-                # 確保資料格式相容性
-                if isinstance(history_data, dict):
-                    # 新格式：包含版本資訊和其他元資料
-                    sessions = history_data.get("sessions", [])
-                    last_cleanup = history_data.get("lastCleanup", 0)
-                else:
-                    # 舊格式：直接是會話陣列（向後相容）
-                    sessions = history_data if isinstance(history_data, list) else []
-                    last_cleanup = 0
+            # 確保資料格式相容性
+            if isinstance(history_data, dict):
+                # 新格式：包含版本資訊和其他元資料
+                sessions = history_data.get("sessions", [])
+                last_cleanup = history_data.get("lastCleanup", 0)
+            else:
+                # 舊格式：直接是會話陣列（向後相容）
+                sessions = history_data if isinstance(history_data, list) else []
+                last_cleanup = 0
 
-                # 回傳與 localStorage 格式相容的資料
-                return JSONResponse(
-                    content={"sessions": sessions, "lastCleanup": last_cleanup}
-                )
+            # 回傳與 localStorage 格式相容的資料
+            return ORJSONResponse(
+                content={"sessions": sessions, "lastCleanup": last_cleanup}
+            )
 
+        except FileNotFoundError:
             debug_log("會話歷史檔案不存在，返回空歷史")
-            return JSONResponse(content={"sessions": [], "lastCleanup": 0})
-
+            return ORJSONResponse(content={"sessions": [], "lastCleanup": 0})
         except Exception as e:
             debug_log(f"載入會話歷史失敗: {e}")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"載入失敗: {e!s}"},
             )
@@ -351,11 +438,6 @@ def setup_routes(manager: "WebUIManager"):
         try:
             data = await request.json()
 
-            # 使用統一的設定檔案路徑
-            config_dir = Path.home() / ".config" / "mcp-feedback-enhanced"
-            config_dir.mkdir(parents=True, exist_ok=True)
-            history_file = config_dir / "session_history.json"
-
             # 建立新格式的資料結構
             history_data = {
                 "version": "1.0",
@@ -365,19 +447,19 @@ def setup_routes(manager: "WebUIManager"):
             }
 
             # 如果是首次儲存且有 localStorage 遷移標記
-            if not history_file.exists() and data.get("migratedFrom") == "localStorage":
+            migrated = data.get("migratedFrom") == "localStorage"
+            if migrated and not await asyncio.to_thread(HISTORY_FILE.exists):
                 history_data["migratedFrom"] = "localStorage"
                 history_data["migratedAt"] = int(time.time() * 1000)
 
-            # 保存會話歷史到檔案
-            with open(history_file, "w", encoding="utf-8") as f:
-                json.dump(history_data, f, ensure_ascii=False, indent=2)
+            # 保存會話歷史到檔案（在線程池中執行，避免阻塞事件循環）
+            await asyncio.to_thread(_write_json, HISTORY_FILE, history_data)
 
-            debug_log(f"會話歷史已保存到: {history_file}")
+            debug_log(f"會話歷史已保存到: {HISTORY_FILE}")
             session_count = len(history_data["sessions"])
             debug_log(f"保存了 {session_count} 個會話記錄")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={
                     "status": "success",
                     "message": f"會話歷史已保存（{session_count} 個會話）",
@@ -386,7 +468,7 @@ def setup_routes(manager: "WebUIManager"):
 
         except Exception as e:
             debug_log(f"保存會話歷史失敗: {e}")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"保存失敗: {e!s}"},
             )
@@ -394,35 +476,14 @@ def setup_routes(manager: "WebUIManager"):
     @manager.app.get("/api/active-tabs")
     async def get_active_tabs():
         """獲取活躍標籤頁信息 - 優先使用全局狀態"""
-        current_time = time.time()
-        expired_threshold = 60
-
-        # 清理過期的全局標籤頁
-        valid_global_tabs = {}
-        for tab_id, tab_info in manager.global_active_tabs.items():
-            if current_time - tab_info.get("last_seen", 0) <= expired_threshold:
-                valid_global_tabs[tab_id] = tab_info
+        # 會話的 active_tabs 與全局字典是同一對象，清理一次即可
+        count = manager.get_global_active_tabs_count()
 
-        manager.global_active_tabs = valid_global_tabs
-
-        # 如果有當前會話，也更新會話的標籤頁狀態
-        current_session = manager.get_current_session()
-        if current_session:
-            # 合併會話標籤頁到全局（如果有的話）
-            session_tabs = getattr(current_session, "active_tabs", {})
-            for tab_id, tab_info in session_tabs.items():
-                if current_time - tab_info.get("last_seen", 0) <= expired_threshold:
-                    valid_global_tabs[tab_id] = tab_info
-
-            # 更新會話的活躍標籤頁
-            current_session.active_tabs = valid_global_tabs.copy()
-            manager.global_active_tabs = valid_global_tabs
-
-        return JSONResponse(
+        return ORJSONResponse(
             content={
-                "has_session": current_session is not None,
-                "active_tabs": valid_global_tabs,
-                "count": len(valid_global_tabs),
+                "has_session": manager.get_current_session() is not None,
+                "active_tabs": manager.global_active_tabs,
+                "count": count,
             }
         )
 
@@ -434,11 +495,13 @@ def setup_routes(manager: "WebUIManager"):
             tab_id = data.get("tabId")
 
             if not tab_id:
-                return JSONResponse(status_code=400, content={"error": "缺少 tabId"})
+                return ORJSONResponse(status_code=400, content={"error": "缺少 tabId"})
 
             current_session = manager.get_current_session()
             if not current_session:
-                return JSONResponse(status_code=404, content={"error": "沒有活躍會話"})
+                return ORJSONResponse(
+                    status_code=404, content={"error": "沒有活躍會話"}
+                )
 
             # 註冊標籤頁
             tab_info = {
@@ -447,90 +510,95 @@ def setup_routes(manager: "WebUIManager"):
                 "registered_at": time.time(),
             }
 
-            if not hasattr(current_session, "active_tabs"):
-                current_session.active_tabs = {}
-
-            current_session.active_tabs[tab_id] = tab_info
-
-            # 同時更新全局標籤頁狀態
+            # 會話的 active_tabs 與全局字典是同一對象，只需寫入一次
             manager.global_active_tabs[tab_id] = tab_info
 
             debug_log(f"標籤頁已註冊: {tab_id}")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"status": "success", "tabId": tab_id, "registered": True}
             )
 
         except Exception as e:
             debug_log(f"註冊標籤頁失敗: {e}")
-            return JSONResponse(status_code=500, content={"error": f"註冊失敗: {e!s}"})
+            return ORJSONResponse(
+                status_code=500, content={"error": f"註冊失敗: {e!s}"}
+            )
 
 
-async def handle_websocket_message(manager: "WebUIManager", session, data: dict):
-    """處理 WebSocket 消息"""
-    message_type = data.get("type")
+async def _on_submit_feedback(manager: "WebUIManager", session, data: dict):
+    """提交回饋"""
+    feedback = data.get("feedback", "")
+    images = data.get("images", [])
+    settings = data.get("settings", {})
+    await session.submit_feedback(feedback, images, settings)
 
-    if message_type == "submit_feedback":
-        # 提交回饋
-        feedback = data.get("feedback", "")
-        images = data.get("images", [])
-        settings = data.get("settings", {})
-        await session.submit_feedback(feedback, images, settings)
-
-    elif message_type == "run_command":
-        # 執行命令
-        command = data.get("command", "")
-        if command.strip():
-            await session.run_command(command)
-
-    elif message_type == "get_status":
-        # 獲取會話狀態
-        if session.websocket:
-            try:
-                await session.websocket.send_json(
-                    {"type": "status_update", "status_info": session.get_status_info()}
-                )
-            except Exception as e:
-                debug_log(f"發送狀態更新失敗: {e}")
 
-    elif message_type == "heartbeat":
-        # WebSocket 心跳處理
-        tab_id = data.get("tabId", "unknown")
-        timestamp = data.get("timestamp", 0)
+async def _on_run_command(manager: "WebUIManager", session, data: dict):
+    """執行命令"""
+    command = data.get("command", "")
+    if command.strip():
+        await session.run_command(command)
 
-        tab_info = {"timestamp": timestamp, "last_seen": time.time()}
 
-        # 更新會話的標籤頁信息
-        if hasattr(session, "active_tabs"):
-            session.active_tabs[tab_id] = tab_info
-        else:
-            session.active_tabs = {tab_id: tab_info}
+async def _on_get_status(manager: "WebUIManager", session, data: dict):
+    """獲取會話狀態"""
+    if session.websocket:
+        try:
+            await session.websocket.send_json(
+                {"type": "status_update", "status_info": session.get_status_info()}
+            )
+        except Exception as e:
+            debug_log(f"發送狀態更新失敗: {e}")
 
-        # 同時更新全局標籤頁狀態
-        manager.global_active_tabs[tab_id] = tab_info
 
-        # 發送心跳回應
-        if session.websocket:
-            try:
-                await session.websocket.send_json(
-                    {
-                        "type": "heartbeat_response",
-                        "tabId": tab_id,
-                        "timestamp": timestamp,
-                    }
-                )
-            except Exception as e:
-                debug_log(f"發送心跳回應失敗: {e}")
+async def _on_heartbeat(manager: "WebUIManager", session, data: dict):
+    """WebSocket 心跳處理"""
+    tab_id = data.get("tabId", "unknown")
+    timestamp = data.get("timestamp", 0)
+
+    # 更新標籤頁信息（會話的 active_tabs 與全局字典是同一對象）
+    manager.global_active_tabs[tab_id] = {
+        "timestamp": timestamp,
+        "last_seen": time.time(),
+    }
 
-    elif message_type == "user_timeout":
-        # 用戶設置的超時已到
-        debug_log(f"收到用戶超時通知: {session.session_id}")
-        # 清理會話資源
-        await session._cleanup_resources_on_timeout()
-        # 重構：不再自動停止服務器，保持服務器運行以支援持久性
+    # 發送心跳回應
+    if session.websocket:
+        try:
+            await session.websocket.send_text(HEARTBEAT_RESPONSE_TEXT)
+        except Exception as e:
+            debug_log(f"發送心跳回應失敗: {e}")
 
-    else:
+
+async def _on_user_timeout(manager: "WebUIManager", session, data: dict):
+    """用戶設置的超時已到"""
+    debug_log(f"收到用戶超時通知: {session.session_id}")
+    # 清理會話資源
+    await session._cleanup_resources_on_timeout()
+    # 重構：不再自動停止服務器，保持服務器運行以支援持久性
+
+
+# WebSocket 消息類型到處理函數的映射，新增類型只需註冊到這裡
+WS_MESSAGE_HANDLERS = {
+    "submit_feedback": _on_submit_feedback,
+    "run_command": _on_run_command,
+    "get_status": _on_get_status,
+    "heartbeat": _on_heartbeat,
+    "user_timeout": _on_user_timeout,
+}
+
+
+async def handle_websocket_message(manager: "WebUIManager", session, data: dict):
+    """處理 WebSocket 消息"""
+    message_type = data.get("type")
+
+    handler = WS_MESSAGE_HANDLERS.get(message_type)
+    if handler is None:
         debug_log(f"未知的消息類型: {message_type}")
+        return
+
+    await handler(manager, session, data)
 
 
 async def _delayed_server_stop(manager: "WebUIManager"):
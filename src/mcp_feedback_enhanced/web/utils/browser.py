@@ -6,6 +6,7 @@
 提供瀏覽器相關的工具函數，包含 WSL 環境的特殊處理。
 """
 
+import functools
 import os
 import subprocess
 import webbrowser
@@ -15,20 +16,25 @@ from collections.abc import Callable
 from ...debug import server_debug_log as debug_log
 
 
+@functools.lru_cache(maxsize=1)
 def is_wsl_environment() -> bool:
     """
     檢測是否在 WSL 環境中運行
 
+    運行環境在進程生命週期內不會改變，結果在首次檢測後緩存。
+
     Returns:
         bool: True 表示 WSL 環境，False 表示其他環境
     """
     try:
-        # 檢查 /proc/version 文件是否包含 WSL 標識
-        if os.path.exists("/proc/version"):
-            with open("/proc/version") as f:
+        # 檢查 /proc/version 文件是否包含 WSL 標識（以二進位模式直接讀取，不存在時跳過）
+        try:
+            with open("/proc/version", "rb") as f:
                 version_info = f.read().lower()
-                if "microsoft" in version_info or "wsl" in version_info:
-                    return True
+        except OSError:
+            version_info = b""
+        if b"microsoft" in version_info or b"wsl" in version_info:
+            return True
 
         # 檢查 WSL 相關環境變數
         wsl_env_vars = ["WSL_DISTRO_NAME", "WSL_INTEROP", "WSLENV"]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+AI 工具輔助函數測試模組
+
+測試 AI 工具共用的輔助函數，包括：
+- DAG JSON 的解析與校驗
+- 結果構建函數的快取隔離
+"""
+
+import pytest
+
+from mcp_feedback_enhanced.server import (
+    _build_execution_orchestration,
+    _build_next_node_recommendation,
+    _build_position_identification,
+    _parse_dag,
+)
+
+
+class TestParseDag:
+    """DAG JSON 解析測試"""
+
+    def test_valid_object(self):
+        """測試 JSON 物件被解析為字典"""
+        dag = _parse_dag('{"nodes": ["a", "b"], "edges": [["a", "b"]]}')
+        assert dag == {"nodes": ["a", "b"], "edges": [["a", "b"]]}
+
+    @pytest.mark.parametrize("dag_json", ["[1, 2]", '"dag"', "42", "null"])
+    def test_non_object_rejected(self, dag_json):
+        """測試頂層不是物件的 JSON 被拒絕"""
+        with pytest.raises(ValueError):
+            _parse_dag(dag_json)
+
+    @pytest.mark.parametrize("dag_json", ['{"nodes": [', "{nodes: []}", ""])
+    def test_malformed_json_rejected(self, dag_json):
+        """測試格式錯誤的 JSON 被拒絕"""
+        with pytest.raises(ValueError):
+            _parse_dag(dag_json)
+
+
+CACHED_BUILDER_CASES = [
+    pytest.param(
+        _build_position_identification, ('{"nodes": []}', "{}", ""), id="position"
+    ),
+    pytest.param(
+        _build_next_node_recommendation,
+        ('{"layer": "function"}', "{}", "", ""),
+        id="next_node",
+    ),
+    pytest.param(
+        _build_execution_orchestration,
+        ('{"nodes": ["a"]}', "{}", "{}"),
+        id="orchestration",
+    ),
+]
+
+
+@pytest.mark.parametrize(("builder", "args"), CACHED_BUILDER_CASES)
+class TestCachedBuilders:
+    """帶快取的結果構建函數測試"""
+
+    def test_repeated_calls_are_independent(self, builder, args):
+        """測試相同參數的兩次調用結果相等但互不共享"""
+        first = builder(*args)
+        second = builder(*args)
+
+        assert first == second
+        assert first is not second
+
+        # 修改返回值（包括嵌套結構）不影響後續調用
+        nested_key = next(
+            key for key, value in first.items() if isinstance(value, dict)
+        )
+        first[nested_key].clear()
+        first["analysis_note"] = "已修改"
+
+        third = builder(*args)
+        assert third == second
+        assert third[nested_key]
+        assert "analysis_note" not in third
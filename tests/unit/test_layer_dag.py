@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+四層 DAG 構建工具測試模組
+
+測試 build_*_layer_dag 工具的輸出結構，包括：
+- 存儲路徑格式
+- 層間依賴聲明
+- 跨層映射字段
+- 排序層的四層總結
+- 錯誤路徑的輸入摘要
+"""
+
+import json
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import pytest
+
+from mcp_feedback_enhanced import server
+from mcp_feedback_enhanced.server import (
+    build_code_layer_dag,
+    build_function_layer_dag,
+    build_logic_layer_dag,
+    build_order_layer_dag,
+)
+
+
+MERMAID_DAG = "graph TD\n    A[需求] --> B[設計]\n    B --> C[實現]\n"
+
+
+@dataclass(frozen=True)
+class LayerCase:
+    """單層工具的期望輸出"""
+
+    tool: Callable[..., str]
+    layer: str
+    upstream_key: str
+    extra_key: str
+    depends_on: list[str] | None
+    mapping_keys: list[str] | None
+
+    def call(self, upstream: str = "上游輸入", mermaid: str = MERMAID_DAG) -> dict:
+        """以關鍵字參數調用工具並解析 JSON 結果"""
+        return json.loads(
+            self.tool(
+                **{
+                    self.upstream_key: upstream,
+                    "mermaid_dag": mermaid,
+                    self.extra_key: "補充",
+                }
+            )
+        )
+
+
+FUNCTION_CASE = LayerCase(
+    build_function_layer_dag,
+    "function",
+    "project_description",
+    "business_requirements",
+    None,
+    None,
+)
+LOGIC_CASE = LayerCase(
+    build_logic_layer_dag,
+    "logic",
+    "function_layer_result",
+    "technical_architecture",
+    ["function"],
+    ["function_to_logic", "mapping_completeness", "consistency_check"],
+)
+CODE_CASE = LayerCase(
+    build_code_layer_dag,
+    "code",
+    "logic_layer_result",
+    "implementation_details",
+    ["function", "logic"],
+    ["logic_to_code", "implementation_coverage", "dependency_analysis"],
+)
+ORDER_CASE = LayerCase(
+    build_order_layer_dag,
+    "order",
+    "code_layer_result",
+    "execution_strategy",
+    ["function", "logic", "code"],
+    ["code_to_order", "execution_feasibility", "resource_allocation"],
+)
+LAYER_CASES = [FUNCTION_CASE, LOGIC_CASE, CODE_CASE, ORDER_CASE]
+
+
+@pytest.mark.parametrize("case", LAYER_CASES, ids=lambda case: case.layer)
+class TestLayerDagTools:
+    """各層 DAG 構建工具測試"""
+
+    def test_success_result(self, case):
+        """測試成功結果的基本結構和輸入回顯"""
+        result = case.call()
+
+        assert result["success"] is True
+        assert result["layer_type"] == case.layer
+        assert list(result["input_data"]) == [
+            case.upstream_key,
+            "mermaid_dag",
+            case.extra_key,
+            "timestamp",
+        ]
+        assert result["input_data"][case.upstream_key] == "上游輸入"
+
+        metadata = result["parsed_dag"]["metadata"]
+        assert metadata["layer"] == case.layer
+        assert metadata["node_count"] == 2
+        assert metadata["edge_count"] == 2
+        assert result["validation"]["is_valid"] is True
+
+    def test_storage_path(self, case):
+        """測試存儲路徑由層類型和 DAG 摘要組成，且跨調用穩定"""
+        result = case.call()
+        storage_path = result["storage_info"]["storage_path"]
+
+        assert re.fullmatch(rf"{case.layer}_layer_[0-9a-f]{{10}}\.json", storage_path)
+        digest = server._dag_digest(MERMAID_DAG)
+        assert storage_path == f"{case.layer}_layer_{digest}.json"
+        assert case.call()["storage_info"] == result["storage_info"]
+
+    def test_depends_on(self, case):
+        """測試依賴層聲明，功能層不輸出 depends_on"""
+        metadata = case.call()["parsed_dag"]["metadata"]
+
+        if case.depends_on is None:
+            assert "depends_on" not in metadata
+        else:
+            assert metadata["depends_on"] == case.depends_on
+
+    def test_cross_layer_mapping(self, case):
+        """測試跨層映射字段，功能層沒有跨層映射"""
+        result = case.call()
+
+        if case.mapping_keys is None:
+            assert "cross_layer_mapping" not in result
+        else:
+            mapping_key, score_key, status_key = case.mapping_keys
+            assert result["cross_layer_mapping"] == {
+                mapping_key: {},
+                score_key: 0.0,
+                status_key: "pending",
+            }
+            assert list(result["cross_layer_mapping"]) == case.mapping_keys
+
+    def test_four_layer_summary_only_on_order(self, case):
+        """測試只有排序層輸出四層總結和完整 DAG 路徑"""
+        result = case.call()
+
+        if case is ORDER_CASE:
+            assert "four_layer_summary" in result
+            assert "complete_dag_path" in result["storage_info"]
+        else:
+            assert "four_layer_summary" not in result
+            assert "complete_dag_path" not in result["storage_info"]
+
+    def test_error_path_input_data(self, case, monkeypatch):
+        """測試構建失敗時的錯誤結果和輸入摘要"""
+
+        def fail(*parts):
+            raise RuntimeError("摘要失敗")
+
+        monkeypatch.setattr(server, "_dag_digest", fail)
+        result = case.call()
+
+        assert result["success"] is False
+        assert result["layer_type"] == case.layer
+        assert result["error"] == "摘要失敗"
+        assert result["error_type"] == "parsing_error"
+
+        # 功能層原樣回傳項目描述，其餘層只回傳上游結果的長度
+        if case.depends_on is None:
+            expected_upstream = {case.upstream_key: "上游輸入"}
+        else:
+            expected_upstream = {f"{case.upstream_key}_length": len("上游輸入")}
+        assert result["input_data"] == {
+            **expected_upstream,
+            "mermaid_dag_length": len(MERMAID_DAG),
+        }
+
+
+class TestOrderLayerSummary:
+    """排序層專屬輸出測試"""
+
+    def test_four_layer_summary(self):
+        """測試排序層的四層總結內容和完整 DAG 路徑"""
+        result = ORDER_CASE.call()
+
+        summary = result["four_layer_summary"]
+        assert summary["all_layers_completed"] is True
+        assert summary["total_layers"] == 4
+        assert summary["layer_sequence"] == ["function", "logic", "code", "order"]
+        assert summary["integration_status"] == "ready_for_validation"
+        assert result["validation"]["validation_messages"] == [
+            "排序層 DAG 接收成功",
+            "四層 DAG 構建完成",
+        ]
+
+        digest = server._dag_digest("上游輸入", MERMAID_DAG)
+        assert result["storage_info"]["complete_dag_path"] == (
+            f"complete_four_layer_dag_{digest}.json"
+        )
+
+    def test_empty_mermaid_counts(self):
+        """測試空 Mermaid 描述時節點和邊計數為 0"""
+        metadata = ORDER_CASE.call(mermaid="")["parsed_dag"]["metadata"]
+
+        assert metadata["node_count"] == 0
+        assert metadata["edge_count"] == 0
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+DAG 並行調度器測試模組
+
+測試 ParallelDispatcher 的各項功能，包括：
+- Kahn 拓撲分層
+- 環檢測
+- 執行編排工具輸出的並行批次
+"""
+
+import json
+
+import pytest
+
+from mcp_feedback_enhanced.server import ai_orchestrate_execution
+from mcp_feedback_enhanced.utils.parallel_dispatcher import ParallelDispatcher
+
+
+class TestTopologicalLayers:
+    """拓撲分層測試"""
+
+    def test_layers_group_independent_nodes(self):
+        """測試互不依賴的節點被分到同一層"""
+        layers = ParallelDispatcher.topological_layers(
+            ["a", "b", "c", "d"], [("a", "c"), ("b", "c"), ("c", "d")]
+        )
+        assert layers == [["a", "b"], ["c"], ["d"]]
+
+    def test_layers_include_nodes_only_in_edges(self):
+        """測試僅在邊中出現的節點也會被分層"""
+        layers = ParallelDispatcher.topological_layers([], [("a", "b")])
+        assert layers == [["a"], ["b"]]
+
+    def test_cycle_raises(self):
+        """測試存在環時拋出 ValueError"""
+        with pytest.raises(ValueError):
+            ParallelDispatcher.topological_layers(["a", "b"], [("a", "b"), ("b", "a")])
+
+
+class TestExecutionOrchestrationBatches:
+    """執行編排工具的並行批次測試"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_batches_follow_dependencies(self):
+        """測試編排結果按依賴關係輸出並行批次"""
+        dag_data = json.dumps(
+            {
+                "nodes": [{"id": "a"}, {"id": "b"}, {"id": "c"}],
+                "edges": [{"source": "a", "target": "c"}, ["b", "c"]],
+            }
+        )
+
+        result = json.loads(await ai_orchestrate_execution(dag_data, "", ""))
+
+        assert result["success"] is True
+        assert result["execution_plan"]["parallel_batches"] == [["a", "b"], ["c"]]
+
+    @pytest.mark.asyncio
+    async def test_cyclic_dag_yields_no_batches(self):
+        """測試 DAG 存在環時並行批次為空，工具仍返回成功結果"""
+        dag_data = json.dumps({"nodes": ["a", "b"], "edges": [["a", "b"], ["b", "a"]]})
+
+        result = json.loads(await ai_orchestrate_execution(dag_data, "", ""))
+
+        assert result["success"] is True
+        assert result["execution_plan"]["parallel_batches"] == []
@@ -3,10 +3,15 @@
 Web UI 單元測試
 """
 
+import asyncio
+import os
+import stat
+import sys
 import time
 
 import pytest
 
+from mcp_feedback_enhanced.web.routes import main_routes
 from tests.fixtures.test_data import TestData
 from tests.helpers.test_utils import TestUtils
 
@@ -75,6 +80,38 @@ class TestWebUIManager:
         count = web_ui_manager.get_global_active_tabs_count()
         assert count == 1  # 只剩下有效的標籤頁
 
+    def test_session_shares_global_tabs(self, web_ui_manager, test_project_dir):
+        """測試新會話與全局共用同一個標籤頁字典"""
+        web_ui_manager.global_active_tabs["tab-1"] = {"last_seen": time.time()}
+
+        web_ui_manager.create_session(str(test_project_dir), "第一個會話")
+        first_session = web_ui_manager.get_current_session()
+        assert first_session.active_tabs is web_ui_manager.global_active_tabs
+
+        # 寫入全局字典即對會話可見
+        web_ui_manager.global_active_tabs["tab-2"] = {"last_seen": time.time()}
+        assert set(first_session.active_tabs) == {"tab-1", "tab-2"}
+
+        # 切換會話後新會話仍共用同一個字典，標籤頁狀態得以保留
+        web_ui_manager.create_session(str(test_project_dir), "第二個會話")
+        second_session = web_ui_manager.get_current_session()
+        assert second_session.active_tabs is web_ui_manager.global_active_tabs
+        assert set(second_session.active_tabs) == {"tab-1", "tab-2"}
+
+    def test_expired_tabs_pruned_in_place(self, web_ui_manager, test_project_dir):
+        """測試過期標籤頁原地清理，不破壞會話與全局的共用關係"""
+        web_ui_manager.create_session(str(test_project_dir), "測試會話")
+        session = web_ui_manager.get_current_session()
+        global_tabs = web_ui_manager.global_active_tabs
+
+        global_tabs["tab-live"] = {"last_seen": time.time()}
+        global_tabs["tab-old"] = {"last_seen": time.time() - 120}
+
+        assert web_ui_manager.get_global_active_tabs_count() == 1
+        assert web_ui_manager.global_active_tabs is global_tabs
+        assert session.active_tabs is global_tabs
+        assert set(session.active_tabs) == {"tab-live"}
+
 
 class TestWebFeedbackSession:
     """Web 回饋會話測試"""
@@ -157,6 +194,53 @@ class TestWebFeedbackSession:
         assert session.settings == TestData.SAMPLE_FEEDBACK["settings"]
         assert session.status == SessionStatus.FEEDBACK_SUBMITTED
 
+    @pytest.mark.asyncio
+    async def test_command_output_batching(self, test_project_dir, monkeypatch):
+        """測試命令輸出按大小上限合併為多個幀"""
+        from mcp_feedback_enhanced.web.models import (
+            WebFeedbackSession,
+            feedback_session,
+        )
+
+        batch_max_chars = 1000
+        monkeypatch.setattr(
+            feedback_session, "COMMAND_OUTPUT_BATCH_MAX_CHARS", batch_max_chars
+        )
+
+        script = test_project_dir / "emit_lines.py"
+        script.write_text("for i in range(500):\n    print(f'{i:04d}' + 'x' * 96)\n")
+        expected = "".join(f"{i:04d}" + "x" * 96 + "\n" for i in range(500))
+
+        class RecordingWebSocket:
+            def __init__(self):
+                self.messages = []
+                self.completed = asyncio.Event()
+
+            async def send_json(self, data):
+                self.messages.append(data)
+                if data["type"] == "command_complete":
+                    self.completed.set()
+
+        session = WebFeedbackSession(
+            "test-session", str(test_project_dir), TestData.SAMPLE_SESSION["summary"]
+        )
+        websocket = RecordingWebSocket()
+        session.websocket = websocket
+
+        await session.run_command(f'"{sys.executable}" "{script}"')
+        await asyncio.wait_for(websocket.completed.wait(), timeout=30)
+
+        outputs = [
+            message["output"]
+            for message in websocket.messages
+            if message["type"] == "command_output"
+        ]
+        assert "".join(outputs) == expected
+        assert all(len(output) <= batch_max_chars for output in outputs)
+        # 輸出在子進程退出時一次性到達，應被合併而非逐行發送
+        assert len(outputs) < 500
+        assert websocket.messages[-1] == {"type": "command_complete", "exit_code": 0}
+
 
 class TestWebUIRoutes:
     """Web UI 路由測試"""
@@ -207,6 +291,97 @@ class TestWebUIRoutes:
         assert data["project_directory"] == str(test_project_dir)
         assert data["summary"] == TestData.SAMPLE_SESSION["summary"]
 
+    def test_api_translations_etag(self, web_ui_manager):
+        """測試翻譯 API 的 ETag 和 304 回應"""
+        from fastapi.testclient import TestClient
+
+        client = TestClient(web_ui_manager.app)
+        response = client.get("/api/translations")
+
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        # 緩存中間件不應以 no-store 覆蓋路由設置的緩存頭
+        assert response.headers["cache-control"] == "no-cache"
+        assert "zh-TW" in response.json()
+
+        response = client.get("/api/translations", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+        response = client.get("/api/translations", headers={"If-None-Match": '"x"'})
+        assert response.status_code == 200
+
+
+class TestAtomicJsonWrite:
+    """設定檔案原子寫入測試"""
+
+    def test_write_replaces_content(self, temp_dir):
+        """測試寫入內容正確且不殘留臨時檔案"""
+        target = temp_dir / "config" / "ui_settings.json"
+        main_routes._write_json(target, {"layoutMode": "grid"})
+        main_routes._write_json(target, {"layoutMode": "combined-vertical", "名": "值"})
+
+        assert main_routes._read_json(target) == {
+            "layoutMode": "combined-vertical",
+            "名": "值",
+        }
+        assert os.listdir(target.parent) == ["ui_settings.json"]
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX 權限位")
+    def test_write_preserves_mode(self, temp_dir):
+        """測試替換後沿用原檔案的權限"""
+        target = temp_dir / "ui_settings.json"
+        target.write_bytes(b"{}")
+        os.chmod(target, 0o644)
+
+        main_routes._write_json(target, {"a": 1})
+
+        assert stat.S_IMODE(target.stat().st_mode) == 0o644
+
+    def test_failed_write_cleans_up(self, temp_dir):
+        """測試序列化失敗時原檔案不變且臨時檔案被刪除"""
+        target = temp_dir / "session_history.json"
+        target.write_bytes(b'{"sessions":[]}')
+
+        with pytest.raises(TypeError):
+            main_routes._write_json(target, {"bad": object()})
+
+        assert target.read_bytes() == b'{"sessions":[]}'
+        assert os.listdir(temp_dir) == ["session_history.json"]
+
+    def test_failed_replace_cleans_up(self, temp_dir, monkeypatch):
+        """測試替換失敗時臨時檔案被刪除"""
+
+        def fail_replace(src, dst):
+            raise OSError("replace failed")
+
+        monkeypatch.setattr(main_routes.os, "replace", fail_replace)
+        target = temp_dir / "ui_settings.json"
+
+        with pytest.raises(OSError):
+            main_routes._write_json(target, {"a": 1})
+
+        assert os.listdir(temp_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes(self, temp_dir):
+        """測試並行寫入同一檔案不會失敗或產生不完整內容"""
+        target = temp_dir / "session_history.json"
+        for round_index in range(20):
+            payloads = [
+                {"round": round_index, "writer": i, "pad": "x" * 4096} for i in range(4)
+            ]
+            await asyncio.gather(
+                *(
+                    asyncio.to_thread(main_routes._write_json, target, data)
+                    for data in payloads
+                )
+            )
+            assert main_routes._read_json(target) in payloads
+
+        assert os.listdir(temp_dir) == ["session_history.json"]
+
 
 class TestWebUIUtilities:
     """Web UI 工具函數測試"""